@@ -0,0 +1,194 @@
+// Clientside chart rendering for Skylitics(clientside=True). The server sends the forecast
+// arrays once per Submit (the forecast-data store); unit, day-range and chart changes are
+// handled here without a round trip.
+(function () {
+    var DAY = 24 * 60 * 60;
+
+    function convert(data, units) {
+        if (units !== 'imperial') {
+            return {temp: data.temp, wind: data.wind_speed, tempUnit: '°C', windUnit: 'm/s'};
+        }
+        return {
+            temp: data.temp.map(function (value) { return Math.round((value * 9 / 5 + 32) * 100) / 100; }),
+            wind: data.wind_speed.map(function (value) { return Math.round(value * 2.23694 * 100) / 100; }),
+            tempUnit: '°F',
+            windUnit: 'mph'
+        };
+    }
+
+    function selectIndices(data, days) {
+        // Same rules as skyscope.columns: entries from today (UTC) on; 'daily' keeps the first of each day
+        var today = Math.floor(Date.now() / 1000 / DAY);
+        var indices = [];
+        var seen = {};
+        for (var i = 0; i < data.dt.length; i++) {
+            var day = Math.floor(data.dt[i] / DAY);
+            if (day < today || day >= today + days) {
+                continue;
+            }
+            if (data.mode === 'daily') {
+                if (seen[day]) {
+                    continue;
+                }
+                seen[day] = true;
+            }
+            indices.push(i);
+        }
+        return indices;
+    }
+
+    function pick(values, indices) {
+        return indices.map(function (i) { return values[i]; });
+    }
+
+    var builders = {
+        bar: function (view) {
+            return {
+                data: [
+                    {type: 'bar', name: 'Temperature (' + view.tempUnit + ')', x: view.dates, y: view.temp, marker: {color: 'blue'}},
+                    {type: 'bar', name: 'Humidity (%)', x: view.dates, y: view.humidity, marker: {color: 'orange'}}
+                ],
+                layout: {
+                    title: {text: 'Temperature and Humidity for the Next ' + view.days + ' Days'},
+                    barmode: 'group',
+                    xaxis: {title: {text: 'Date'}},
+                    yaxis: {title: {text: 'Value'}},
+                    template: view.template
+                }
+            };
+        },
+        pie: function (view) {
+            var counts = {};
+            view.weather.forEach(function (code) {
+                var name = view.conditions[code];
+                counts[name] = (counts[name] || 0) + 1;
+            });
+            return {
+                data: [{type: 'pie', labels: Object.keys(counts), values: Object.values(counts)}],
+                layout: {title: {text: 'Weather Condition Distribution for the Next ' + view.days + ' Days'}}
+            };
+        },
+        gauge: function (view) {
+            return {
+                data: [{
+                    type: 'indicator',
+                    mode: 'gauge+number',
+                    value: view.humidity[0],
+                    title: {text: 'Current Humidity (%)'},
+                    gauge: {axis: {range: [0, 100]}, bar: {color: 'blue'}}
+                }],
+                layout: {}
+            };
+        },
+        box: function (view) {
+            return {
+                data: [{type: 'box', y: view.temp, boxmean: true}],
+                layout: {
+                    title: {text: 'Temperature Variability for the Next ' + view.days + ' Days'},
+                    yaxis: {title: {text: 'Temperature (' + view.tempUnit + ')'}}
+                }
+            };
+        },
+        heatmap: function (view) {
+            return {
+                data: [{
+                    type: 'heatmap',
+                    z: [view.temp, view.humidity],
+                    x: view.dates,
+                    y: ['Temperature (' + view.tempUnit + ')', 'Humidity (%)'],
+                    colorscale: 'Viridis'
+                }],
+                layout: {title: {text: 'Temperature and Humidity Heatmap for the Next ' + view.days + ' Days'}}
+            };
+        },
+        polar: function (view) {
+            return {
+                data: [{
+                    type: 'barpolar',
+                    r: view.wind,
+                    theta: view.windDeg,
+                    width: view.wind.map(function () { return 15; }),
+                    marker: {color: view.wind, colorscale: 'Blues'},
+                    opacity: 0.75
+                }],
+                layout: {
+                    title: {text: 'Wind Speed (' + view.windUnit + ') and Direction'},
+                    polar: {
+                        angularaxis: {direction: 'clockwise', showline: false},
+                        radialaxis: {angle: 45, gridcolor: 'gray'}
+                    }
+                }
+            };
+        },
+        pressure: function (view) {
+            return {
+                data: [{type: 'scatter', x: view.dates, y: view.pressure, mode: 'lines+markers', line: {color: 'purple'}}],
+                layout: {
+                    title: {text: 'Atmospheric Pressure Over the Next ' + view.days + ' Days'},
+                    xaxis: {title: {text: 'Date'}},
+                    yaxis: {title: {text: 'Pressure (hPa)'}},
+                    template: view.template
+                }
+            };
+        },
+        combined: function (view) {
+            return {
+                data: [
+                    {type: 'bar', x: view.dates, y: view.pop.map(function (value) { return value * 100; }),
+                     name: 'Precipitation Probability (%)', marker: {color: 'blue'}, yaxis: 'y'},
+                    {type: 'scatter', x: view.dates, y: view.temp, name: 'Temperature (' + view.tempUnit + ')',
+                     mode: 'lines+markers', line: {color: 'orange'}, yaxis: 'y2'}
+                ],
+                layout: {
+                    title: {text: 'Precipitation Probability and Temperature Over the Next ' + view.days + ' Days',
+                            x: 0.5, y: 0.95, font: {size: 20}},
+                    xaxis: {title: {text: 'Date'}},
+                    yaxis: {title: {text: 'Precipitation Probability (%)', font: {color: 'blue'}}, tickfont: {color: 'blue'}},
+                    yaxis2: {title: {text: 'Temperature (' + view.tempUnit + ')', font: {color: 'orange'}},
+                             tickfont: {color: 'orange'}, overlaying: 'y', side: 'right'},
+                    template: view.template,
+                    legend: {x: 0.02, y: 0.85, bgcolor: 'rgba(255, 255, 255, 0.1)'}
+                }
+            };
+        }
+    };
+
+    function render(name, data, units, days, charts, template) {
+        var noUpdate = window.dash_clientside.no_update;
+        if (!data) {
+            return [{}, {display: 'none'}];
+        }
+        if (!charts || charts.indexOf(name) === -1) {
+            // Hidden charts keep their last figure; nothing is rebuilt until they are shown again
+            return [noUpdate, {display: 'none'}];
+        }
+
+        var indices = selectIndices(data, days);
+        var converted = convert(data, units);
+        var view = {
+            days: days,
+            template: template,
+            tempUnit: converted.tempUnit,
+            windUnit: converted.windUnit,
+            dates: pick(data.labels, indices),
+            temp: pick(converted.temp, indices),
+            wind: pick(converted.wind, indices),
+            humidity: pick(data.humidity, indices),
+            pressure: pick(data.pressure, indices),
+            windDeg: pick(data.wind_deg, indices),
+            pop: pick(data.pop, indices),
+            weather: pick(data.weather, indices),
+            conditions: data.conditions
+        };
+        return [builders[name](view), {}];
+    }
+
+    var functions = {};
+    Object.keys(builders).forEach(function (name) {
+        functions[name] = function (data, units, days, charts, template) {
+            return render(name, data, units, days, charts, template);
+        };
+    });
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {skyscope: functions});
+})();
@@ -0,0 +1,39 @@
+import argparse
+import time
+
+from plotly.io.json import to_json_plotly
+
+import skyscope_dashboard
+from skyscope.sources import HTTPSource
+from skyscope.stub import StubUpstream
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the multi-location comparison view.')
+    parser.add_argument('--cities', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--delay', type=float, default=0.05, help='Simulated upstream latency in seconds')
+    parser.add_argument('--days', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'cities':>8}{'fetch ms':>12}{'figures ms':>12}{'cached ms':>12}{'bytes':>10}")
+    with StubUpstream(delay=args.delay) as stub:
+        for count in args.cities:
+            # A fresh dashboard per row, so every fetch goes upstream
+            dashboard = skyscope_dashboard.Skylitics(days=args.days, source=HTTPSource(url=stub.url))
+            locations = [f"City {index}" for index in range(count)]
+            (grid, _), fetch_ms = timed(lambda: dashboard.comparison_data(locations))
+            (_, figures), build_ms = timed(lambda: dashboard.create_comparison_plots(grid))
+            # A repeat submit: forecasts and figures both come from the caches
+            _, cached_ms = timed(lambda: dashboard.create_comparison_plots(dashboard.comparison_data(locations)[0]))
+            size = sum(len(to_json_plotly(figure)) for figure in figures)
+            print(f"{count:>8}{fetch_ms:>12.1f}{build_ms:>12.1f}{cached_ms:>12.1f}{size:>10}")
+
+
+if __name__ == '__main__':
+    main()
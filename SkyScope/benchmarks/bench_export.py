@@ -0,0 +1,49 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from skyscope.export import CHART_NAMES, export_locations
+from skyscope.stub import StubUpstream
+
+
+def directory_size(directory):
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(directory) for name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure headless chart export throughput.')
+    parser.add_argument('--locations', type=int, default=50)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--format', default='html')
+    parser.add_argument('--mode', choices=['daily', 'series'], default='daily')
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--count', type=int, default=40, help='Entries per synthetic forecast')
+    args = parser.parse_args()
+
+    locations = [f"City {index}" for index in range(args.locations)]
+    print(f"{'processes':>10}{'seconds':>10}{'locations/s':>14}{'charts/s':>10}{'MB written':>12}")
+    with StubUpstream(count=args.count) as stub:
+        # Worker processes build their own HTTPSource from the environment
+        os.environ['SKYSCOPE_UPSTREAM_URL'] = stub.url
+        for processes in args.processes:
+            directory = tempfile.mkdtemp(prefix='skyscope-export-')
+            try:
+                start = time.perf_counter()
+                results = list(export_locations(locations, directory, args.format, args.mode, args.days,
+                                                processes, progress=None))
+                elapsed = time.perf_counter() - start
+                failed = sum(1 for _, _, error in results if error)
+                size = directory_size(directory) / 1e6
+            finally:
+                shutil.rmtree(directory)
+            done = len(results) - failed
+            print(f"{processes:>10}{elapsed:>10.2f}{done / elapsed:>14.1f}{done * len(CHART_NAMES) / elapsed:>10.1f}{size:>12.2f}"
+                  + (f"  ({failed} failed)" if failed else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from skyscope.parse import parse_forecast_bytes
+from skyscope.stub import forecast_payload
+
+
+def full_dicts(body):
+    # The previous response.json() path: every field decoded and kept
+    return json.loads(body)
+
+
+def compact_dicts(body):
+    # The dict form, as replayed fixtures and the Redis cache hold it
+    return parse_forecast_bytes(body).to_payload()
+
+
+def arrays(body):
+    # What HTTPSource.fetch returns and the in-process caches keep
+    return parse_forecast_bytes(body)
+
+
+APPROACHES = {'full dicts': full_dicts, 'compact dicts': compact_dicts, 'arrays': arrays}
+
+
+def measure(parse, body):
+    # Peak and retained bytes allocated while parsing; the body itself was allocated before
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = parse(body)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory use of forecast parsing approaches.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[40, 1000, 10000],
+                        help='Entries per response; 40 is the 5-day /forecast, more mimics hourly endpoints')
+    args = parser.parse_args()
+
+    # Parse time is measured separately from tracemalloc, which slows allocation down
+    print(f"{'entries':>8}  {'approach':<14}{'body KB':>10}{'peak KB':>10}{'kept KB':>10}{'ms':>9}")
+    for count in args.counts:
+        body = json.dumps(forecast_payload(count=count)).encode()
+        for name, parse in APPROACHES.items():
+            peak, retained, _ = measure(parse, body)
+            start = time.perf_counter()
+            parsed = parse(body)
+            elapsed = time.perf_counter() - start
+            del parsed
+            print(f"{count:>8}  {name:<14}{len(body) / 1024:>10.0f}{peak / 1024:>10.0f}{retained / 1024:>10.0f}{elapsed * 1000:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import statistics
+import time
+
+from plotly.io.json import to_json_plotly
+
+from skyscope.columns import ForecastColumns
+from skyscope.figures import figure_json
+from skyscope.stub import forecast_payload
+from skyscope_dashboard import Skylitics
+
+
+def timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings) * 1000
+
+
+def bench(mode, days, compact, repeat):
+    dashboard = Skylitics(mode=mode, days=days, compact=compact)
+    forecasts = dashboard.select(ForecastColumns.from_list(forecast_payload(count=40)['list']))
+
+    figures, build_ms = timed(lambda: dashboard.build_plots(forecasts), repeat)
+    # Dash serializes callback outputs with plotly's JSON encoder
+    payload, dash_ms = timed(lambda: to_json_plotly(list(figures)), repeat)
+    _, light_ms = timed(lambda: [figure_json(fig) for fig in figures], repeat)
+    cached, cached_ms = timed(lambda: dashboard.create_plots(forecasts), repeat)
+    # What the chart callbacks send once the graphs already hold a full figure
+    patches = to_json_plotly([dashboard.figure_patch(figure) for figure in cached])
+
+    return {
+        'figures': len(figures),
+        'bytes': len(payload.encode()),
+        'patch_bytes': len(patches.encode()),
+        'build_ms': build_ms,
+        'serialize_ms': dash_ms,
+        'light_serialize_ms': light_ms,
+        'cached_ms': cached_ms,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare dashboard payload size and serialization time.')
+    parser.add_argument('--mode', choices=['daily', 'series'], default='daily')
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'layout':<10}{'figures':>8}{'bytes':>10}{'patch':>8}{'build ms':>10}{'dash ms':>10}{'light ms':>10}{'cached ms':>11}")
+    for name, compact in [('separate', False), ('compact', True)]:
+        result = bench(args.mode, args.days, compact, args.repeat)
+        print(f"{name:<10}{result['figures']:>8}{result['bytes']:>10}{result['patch_bytes']:>8}{result['build_ms']:>10.2f}"
+              f"{result['serialize_ms']:>10.2f}{result['light_serialize_ms']:>10.2f}{result['cached_ms']:>11.3f}")
@@ -0,0 +1,90 @@
+import argparse
+import statistics
+import threading
+import time
+
+from skyscope.client import FetchClient
+from skyscope.scheduler import BATCH, UpstreamScheduler, upstream_priority
+from skyscope.sources import FetchError, HTTPSource
+from skyscope.stub import StubUpstream
+
+
+def run(stub, scheduler, seconds, threads, interval):
+    # `threads` batch workers fetch back to back while one user submits every `interval` seconds
+    source = HTTPSource(url=stub.url, client=FetchClient(pool_size=threads + 1), scheduler=scheduler)
+    deadline = time.monotonic() + seconds
+    counts = {'ok': 0, 'failed': 0}
+    latencies = []
+    user_failures = []
+    lock = threading.Lock()
+
+    def batch(worker):
+        index = 0
+        with upstream_priority(BATCH):
+            while time.monotonic() < deadline:
+                try:
+                    source.fetch(f"City {worker}-{index}")
+                    outcome = 'ok'
+                except FetchError:
+                    outcome = 'failed'
+                with lock:
+                    counts[outcome] += 1
+                index += 1
+
+    def user():
+        while time.monotonic() < deadline:
+            start = time.monotonic()
+            try:
+                source.fetch('London')
+                latencies.append(time.monotonic() - start)
+            except FetchError:
+                user_failures.append(time.monotonic() - start)
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    workers = [threading.Thread(target=batch, args=(worker,), daemon=True) for worker in range(threads)]
+    workers.append(threading.Thread(target=user, daemon=True))
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    return {
+        'calls/min': (counts['ok'] + len(latencies)) * 60 / elapsed,
+        'requests': stub.requests,
+        '429s': stub.limited,
+        'batch failed': counts['failed'],
+        'user p50 ms': statistics.median(latencies) * 1000 if latencies else float('nan'),
+        'user max ms': max(latencies) * 1000 if latencies else float('nan'),
+        'user failed': len(user_failures),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upstream throughput and 429s with and without the scheduler.')
+    parser.add_argument('--per-minute', type=int, default=120, help='Quota the stub upstream enforces')
+    parser.add_argument('--seconds', type=float, default=60.0)
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent batch fetches')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between interactive fetches')
+    parser.add_argument('--delay', type=float, default=0.02, help='Simulated upstream latency in seconds')
+    args = parser.parse_args()
+
+    scenarios = {
+        'unscheduled': lambda: None,
+        'scheduled': lambda: UpstreamScheduler(per_minute=args.per_minute, per_day=None),
+    }
+    results = {}
+    for name, scheduler in scenarios.items():
+        with StubUpstream(delay=args.delay, limit=args.per_minute) as stub:
+            results[name] = run(stub, scheduler(), args.seconds, args.threads, args.interval)
+
+    columns = list(next(iter(results.values())))
+    print(f"{'':<14}" + ''.join(f"{column:>14}" for column in columns))
+    for name, result in results.items():
+        print(f"{name:<14}" + ''.join(f"{result[column]:>14.1f}" for column in columns))
+    print(f"quota: {args.per_minute} calls/min")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import json
+import statistics
+import time
+
+from plotly.io.json import to_json_plotly
+
+import clime_cast
+import clime_charts
+import skyscope_dashboard
+from skyscope.columns import ForecastColumns
+from skyscope.figures import figure_json
+from skyscope.forecast import daily_forecasts as filter_daily
+from skyscope.parse import parse_forecast_bytes
+from skyscope.sources import HTTPSource, ReplaySource
+from skyscope.stub import StubUpstream
+
+STAGES = ['fetch', 'parse', 'filter', 'build', 'serialize']
+
+
+def cast_stages(source, location):
+    forecast = clime_cast.Skylitics(location, source=source)
+    response = yield 'fetch', lambda: source.client.get(source.url, {'q': location, 'units': 'metric'}).content
+    data = yield 'parse', lambda: parse_forecast_bytes(response)
+    daily = yield 'filter', lambda: filter_daily(data['list'])
+    text = yield 'build', lambda: forecast.format_forecast(data['city'], daily)
+    yield 'serialize', lambda: text.encode()
+
+
+def charts_stages(source, location, mode, days):
+    charts = clime_charts.Skylitics(location, mode=mode, days=days, source=source)
+    response = yield 'fetch', lambda: source.client.get(source.url, {'q': location, 'units': 'metric'}).content
+    data = yield 'parse', lambda: parse_forecast_bytes(response)
+    daily = yield 'filter', lambda: charts.select(ForecastColumns.from_payload(data))
+    figures = yield 'build', lambda: charts.create_figures(daily)
+    yield 'serialize', lambda: [figure_json(fig) for fig in figures]
+
+
+def dashboard_stages(source, location, mode, days):
+    dashboard = skyscope_dashboard.Skylitics(mode=mode, days=days, source=source)
+    response = yield 'fetch', lambda: source.client.get(source.url, {'q': location, 'units': 'metric'}).content
+    data = yield 'parse', lambda: parse_forecast_bytes(response)
+    daily = yield 'filter', lambda: dashboard.select(ForecastColumns.from_payload(data))
+    figures = yield 'build', lambda: dashboard.build_plots(daily)
+    # The callback response as Dash encodes it
+    yield 'serialize', lambda: to_json_plotly([fig.to_plotly_json() for fig in figures])
+
+
+def run(stages, repeat):
+    timings = {}
+    result = None
+    try:
+        while True:
+            stage, func = stages.send(result)
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = func()
+                samples.append(time.perf_counter() - start)
+            timings[stage] = statistics.median(samples) * 1000
+    except StopIteration:
+        return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time each stage of the three SkyScope entry points.')
+    parser.add_argument('--location', default='London')
+    parser.add_argument('--count', type=int, default=40, help='Entries per synthetic forecast')
+    parser.add_argument('--fixtures', help='Replay recorded /forecast responses from this directory')
+    parser.add_argument('--mode', choices=['daily', 'series'], default='daily')
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--save', help='Write the timings to this JSON file')
+    parser.add_argument('--compare', help='Show the change against timings saved earlier')
+    args = parser.parse_args()
+
+    replay = ReplaySource(args.fixtures, default=None) if args.fixtures else None
+    with StubUpstream(count=args.count, source=replay) as stub:
+        source = HTTPSource(url=stub.url)
+        results = {
+            'clime_cast': run(cast_stages(source, args.location), args.repeat),
+            'clime_charts': run(charts_stages(source, args.location, args.mode, args.days), args.repeat),
+            'skyscope_dashboard': run(dashboard_stages(source, args.location, args.mode, args.days), args.repeat),
+        }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as saved:
+            baseline = json.load(saved)
+
+    print(f"{'module':<20}" + ''.join(f"{stage + ' ms':>18}" for stage in STAGES))
+    for module, timings in results.items():
+        cells = []
+        for stage in STAGES:
+            cell = f"{timings[stage]:.3f}"
+            if baseline and stage in baseline.get(module, {}):
+                cell += f" ({timings[stage] / baseline[module][stage]:.2f}x)"
+            cells.append(f"{cell:>18}")
+        print(f"{module:<20}" + ''.join(cells))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as saved:
+            json.dump(results, saved, indent=2)
+
+
+if __name__ == '__main__':
+    main()
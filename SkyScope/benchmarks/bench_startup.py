@@ -0,0 +1,61 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from skyscope.stub import StubUpstream
+
+HEAVY = ('numpy', 'plotly', 'dash', 'dash_bootstrap_components', 'flask', 'requests')
+
+COMMANDS = {
+    'help': ['-m', 'skyscope', '--help'],
+    'forecast': ['-m', 'skyscope', 'forecast', '{location}'],
+    'import clime_cast': ['-c', 'import clime_cast'],
+    'import clime_charts': ['-c', 'import clime_charts'],
+    'import skyscope_dashboard': ['-c', 'import skyscope_dashboard'],
+}
+
+
+def run(args, env):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *args], env=env, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, result.stderr
+
+
+def imported(stderr):
+    # Largest cumulative -X importtime of any module in each heavy package that was loaded.
+    # Lazily imported packages show up through their submodules only.
+    loaded = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        package = name.strip().split('.')[0]
+        if package in HEAVY:
+            loaded[package] = max(loaded.get(package, 0), int(cumulative) / 1000)
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time interpreter startup for the SkyScope entry points.')
+    parser.add_argument('--location', default='London')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with StubUpstream() as stub:
+        env = dict(os.environ, SKYSCOPE_UPSTREAM_URL=stub.url)
+        baseline = statistics.median(run(['-c', 'pass'], env)[0] for _ in range(args.repeat)) * 1000
+        print(f"bare interpreter: {baseline:.1f} ms")
+        print(f"{'command':<28}{'wall ms':>10}  heavy imports (ms)")
+        for name, command in COMMANDS.items():
+            command = [part.format(location=args.location) for part in command]
+            wall = statistics.median(run(command, env)[0] for _ in range(args.repeat)) * 1000
+            loaded = imported(run(['-X', 'importtime', *command], env)[1])
+            heavy = ', '.join(f"{module} {ms:.0f}" for module, ms in loaded.items()) or '-'
+            print(f"{name:<28}{wall:>10.1f}  {heavy}")
+
+
+if __name__ == '__main__':
+    main()
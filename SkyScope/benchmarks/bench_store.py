@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+import time
+
+from skyscope.cache import forecast_key
+from skyscope.forecast import FORECAST_STEP
+from skyscope.store import ForecastStore
+from skyscope.stub import forecast_payload
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure ForecastStore appends and range queries.')
+    parser.add_argument('--cities', type=int, default=10)
+    parser.add_argument('--days', type=int, default=90, help='Days of 3-hourly fetches stored per city')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ForecastStore(os.path.join(directory, 'bench.db'))
+        keys = [forecast_key(f"City {index}") for index in range(args.cities)]
+        first = int(time.time()) // FORECAST_STEP * FORECAST_STEP - args.days * 24 * 60 * 60
+        fetches = args.days * 24 * 60 * 60 // FORECAST_STEP
+
+        start = time.perf_counter()
+        for step in range(fetches):
+            issued = first + step * FORECAST_STEP
+            for key in keys:
+                store.append(key, forecast_payload(key[0], start=issued), fetched_at=issued)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(os.path.join(directory, 'bench.db')) / 1e6
+        print(f"appended {fetches * len(keys)} forecasts in {elapsed:.1f} s "
+              f"({fetches * len(keys) / elapsed:.0f}/s), {size:.1f} MB")
+
+        key = keys[0]
+        end = first + (fetches + 40) * FORECAST_STEP
+        ms, _ = timed(lambda: store.latest(key), args.repeat)
+        print(f"latest:                       {ms:8.2f} ms")
+        ms, columns = timed(lambda: store.series(key, first, end), args.repeat)
+        print(f"series over {args.days} days:        {ms:8.2f} ms  ({len(columns)} timestamps)")
+        week = end - 7 * 24 * 60 * 60
+        ms, revisions = timed(lambda: store.history(key, week, end), args.repeat)
+        print(f"history over the last 7 days: {ms:8.2f} ms  ({len(revisions)} forecasts)")
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
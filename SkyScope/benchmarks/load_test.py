@@ -0,0 +1,130 @@
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from skyscope.stub import StubUpstream
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GRAPH_IDS = ['bar-chart', 'pie-chart', 'gauge-chart', 'box-plot', 'heatmap', 'polar-chart', 'line-chart', 'combined-chart']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def submit(session, base, location, previous):
+    # One Submit click: the location callback followed by every chart callback
+    response = session.post(f'{base}/_dash-update-component', json={
+        # Must match the outputs of update_dashboard, or Dash answers "Callback function not found"
+        'output': '..forecast-output.children...forecast-key.data...single-charts.style...comparison-charts.style..',
+        'outputs': [{'id': 'forecast-output', 'property': 'children'}, {'id': 'forecast-key', 'property': 'data'},
+                    {'id': 'single-charts', 'property': 'style'}, {'id': 'comparison-charts', 'property': 'style'}],
+        'inputs': [{'id': 'submit-button', 'property': 'n_clicks', 'value': 1}],
+        'state': [
+            {'id': 'location-input', 'property': 'value', 'value': location},
+            {'id': 'forecast-key', 'property': 'data', 'value': previous}
+        ],
+        'changedPropIds': ['submit-button.n_clicks']
+    })
+    response.raise_for_status()
+    forecast = response.json()['response']['forecast-key']['data']
+
+    for graph_id in GRAPH_IDS:
+        session.post(f'{base}/_dash-update-component', json={
+            'output': f'{graph_id}.figure',
+            'outputs': {'id': graph_id, 'property': 'figure'},
+            'inputs': [{'id': 'forecast-key', 'property': 'data', 'value': forecast}],
+            'changedPropIds': ['forecast-key.data']
+        }).raise_for_status()
+    return forecast
+
+
+def run_clients(base, clients, duration, locations):
+    completed = [0] * clients
+    errors = [0] * clients
+    failures = []  # The first error, to show when nothing succeeds
+    deadline = time.monotonic() + duration
+
+    def client(index):
+        session = requests.Session()
+        previous = None
+        while time.monotonic() < deadline:
+            try:
+                previous = submit(session, base, random.choice(locations), previous)
+                completed[index] += 1
+            except (requests.RequestException, KeyError, ValueError) as error:
+                errors[index] += 1
+                if not failures:
+                    failures.append(f"{type(error).__name__}: {error}")
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(completed), sum(errors), failures[0] if failures else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure dashboard throughput against a local stub upstream.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--locations', type=int, default=200)
+    parser.add_argument('--upstream-delay', type=float, default=0.05)
+    args = parser.parse_args()
+
+    locations = [f'City{index}' for index in range(args.locations)]
+    broken = []
+    with StubUpstream(delay=args.upstream_delay) as stub:
+        print(f"{'workers':>8}{'threads':>8}{'submits/s':>11}{'errors':>8}")
+        for workers in args.workers:
+            port = free_port()
+            env = dict(os.environ, SKYSCOPE_UPSTREAM_URL=stub.url, WEB_CONCURRENCY=str(workers))
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', '--threads', str(args.threads),
+                 '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', 'wsgi:server'],
+                cwd=ROOT, env=env
+            )
+            try:
+                base = f'http://127.0.0.1:{port}'
+                wait_for(base)
+                completed, errors, failure = run_clients(base, args.clients, args.duration, locations)
+                if not completed:
+                    # A throughput of zero measures nothing; report why instead
+                    print(f"{workers:>8}{args.threads:>8}{'failed':>11}{errors:>8}  {failure}")
+                    broken.append(workers)
+                    continue
+                print(f"{workers:>8}{args.threads:>8}{completed / args.duration:>11.1f}{errors:>8}")
+            finally:
+                server.terminate()
+                server.wait()
+
+    if broken:
+        sys.exit(f"Every submit failed with {', '.join(map(str, broken))} worker(s)")
+
+
+if __name__ == '__main__':
+    main()
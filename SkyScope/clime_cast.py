@@ -1,23 +1,29 @@
-import requests
-from datetime import datetime, timedelta
+import argparse
+import sys
+
+from skyscope.forecast import daily_forecasts as filter_daily
+from skyscope.output import CSVWriter, JSONLinesWriter
+from skyscope.sources import FetchError, HTTPSource
+
+# Temperature and wind speed labels for each OpenWeatherMap `units` value
+UNIT_LABELS = {
+    'metric': ('°C', 'm/s'),
+    'imperial': ('°F', 'mph'),
+    'standard': (' K', 'm/s'),
+}
 
 class Skylitics:
 
-    def __init__(self):
-        self.location = input("Enter the location for weather forecast: ")
-        self.api_key = 'API Key'
-        self.url = 'http://api.openweathermap.org/data/2.5/forecast'
-        self.params = {
-            'q': self.location,
-            'appid': self.api_key,
-            'units': 'metric'  # Use 'metric' for Celsius, 'imperial' for Fahrenheit
-        }
+    def __init__(self, location=None, source=None, units='metric', days=3):
+        self.location = location or input("Enter the location for weather forecast: ")
+        self.units = units  # Use 'metric' for Celsius, 'imperial' for Fahrenheit
+        self.days = days
+        self.source = source or HTTPSource()
     
     def weather_data(self):
-        response = requests.get(self.url, self.params)
-        if response.status_code == 200:
-            data = response.json()
-        else:
+        try:
+            data = self.source.fetch(self.location, self.units)
+        except FetchError:
             print("Failed to fetch weather data.")
             return  # Exit if request failed
         
@@ -25,23 +31,16 @@ class Skylitics:
             print("No weather data available.")
             return  # Exit if no data available
         
-        # Extracting today and next two days' weather data
-        print(f"Weather forecast for {data['city']['name']}, {data['city']['country']}:\n")
-
-        current_date = datetime.utcnow().date()
-        forecast_days = [current_date, current_date + timedelta(days=1), current_date + timedelta(days=2)]
-
-        # Filter forecast data to get the first instance of each day
-        daily_forecasts = {}
-        for item in data['list']:
-            forecast_time = datetime.utcfromtimestamp(item['dt'])
-            forecast_date = forecast_time.date()
-        
-            # Store only one forecast per day (the first occurrence)
-            if forecast_date in forecast_days and forecast_date not in daily_forecasts:
-                daily_forecasts[forecast_date] = item
+        # Extracting the first forecast of today and each following day
+        daily_forecasts = filter_daily(data['list'], self.days)
 
         # Print the detailed weather forecast
+        print(self.format_forecast(data['city'], daily_forecasts, self.units))
+
+    @staticmethod
+    def format_forecast(city, daily_forecasts, units='metric'):
+        temp_unit, speed_unit = UNIT_LABELS[units]
+        lines = [f"Weather forecast for {city['name']}, {city['country']}:\n"]
         for forecast_date, forecast in daily_forecasts.items():
             date_str = forecast_date.strftime('%A, %d %B %Y')
             temp = forecast['main']['temp']
@@ -52,15 +51,92 @@ class Skylitics:
             pressure = forecast['main']['pressure']
             precipitation = forecast.get('pop', 0) * 100  # Precipitation probability (0 to 1)
 
-            print(f"{date_str}:")
-            print(f"  Temperature: {temp}°C")
-            print(f"  Humidity: {humidity}%")
-            print(f"  Weather: {description}")
-            print(f"  Wind: {wind_speed} m/s, {wind_direction}°")
-            print(f"  Atmospheric Pressure: {pressure} hPa")
-            print(f"  Precipitation Probability: {precipitation}%")
-            print()  # Blank line for readability
+            lines.append(f"{date_str}:")
+            lines.append(f"  Temperature: {temp}{temp_unit}")
+            lines.append(f"  Humidity: {humidity}%")
+            lines.append(f"  Weather: {description}")
+            lines.append(f"  Wind: {wind_speed} {speed_unit}, {wind_direction}°")
+            lines.append(f"  Atmospheric Pressure: {pressure} hPa")
+            lines.append(f"  Precipitation Probability: {precipitation}%")
+            lines.append("")  # Blank line for readability
+
+        return '\n'.join(lines)
+
+class TextWriter:
+
+    def __init__(self, out, units='metric'):
+        self.out = out
+        self.units = units
+
+    def write(self, result):
+        if result.error:
+            print(f"Failed to fetch weather data for {result.location}. {result.error}", file=sys.stderr)
+            return
+        self.out.write(Skylitics.format_forecast(result.city, result.daily_forecasts, self.units) + '\n')
+        self.out.flush()
+
+
+WRITERS = {'text': TextWriter, 'jsonl': JSONLinesWriter, 'csv': CSVWriter}
+
+
+def read_locations(lines):
+    # Lazily, one per line, so a list of any length is never held in memory
+    for line in lines:
+        location = line.strip()
+        if location and not location.startswith('#'):
+            yield location
+
+
+def run_batch(locations, output_format='text', out=None, source=None, **options):
+    # Results are written in completion order; returns the number of failed locations
+    # asyncio alone costs more startup time than the rest of this script
+    import asyncio
+    from skyscope.batch import BatchFetcher
+
+    writer = WRITERS[output_format](out or sys.stdout, units=options.get('units', 'metric'))
+    failures = 0
+
+    async def consume():
+        nonlocal failures
+        async for result in BatchFetcher(source, **options).stream(locations):
+            failures += bool(result.error)
+            writer.write(result)
+
+    asyncio.run(consume())
+    return failures
+
+
+def add_arguments(parser):
+    parser.add_argument('locations', nargs='*', help='Prompted for when none are given and stdin is a terminal')
+    parser.add_argument('-f', '--file', help="Read locations from this file, one per line ('-' for stdin)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='text', dest='output_format')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--units', choices=['metric', 'imperial', 'standard'], default='metric')
+
+
+def main(args):
+    if args.file and args.file != '-':
+        with open(args.file, encoding='utf-8') as lines:
+            return batch_main(args, read_locations(lines))
+    if args.file == '-' or (not args.locations and not sys.stdin.isatty()):
+        return batch_main(args, read_locations(sys.stdin))
+    if not args.locations:
+        # Interactive, as before
+        Skylitics(units=args.units, days=args.days).weather_data()
+        return 0
+    return batch_main(args, args.locations)
+
+
+def batch_main(args, locations):
+    failures = run_batch(
+        locations, args.output_format,
+        units=args.units, concurrency=args.concurrency, days=args.days
+    )
+    return 1 if failures else 0
+
 
 if __name__ == '__main__':
-    forecast = Skylitics()
-    forecast.weather_data()
+    parser = argparse.ArgumentParser(description='Print weather forecasts for one or more locations.')
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -1,25 +1,29 @@
-import requests
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import numpy as np
+import argparse
+import sys
+
+from skyscope.lazy import lazy_import
+from skyscope.columns import ForecastColumns, first_per_day, series
+from skyscope.export import IMAGE_FORMATS, export_locations, write_figures
+from skyscope.sources import FetchError, HTTPSource
+
+# Loaded on first use; importing this module stays as cheap as clime_cast
+go = lazy_import('plotly.graph_objects')
+np = lazy_import('numpy')
 
 class Skylitics:
 
-    def __init__(self):
-        self.location = input("Enter the location for weather forecast: ")
-        self.api_key = 'API Key'
-        self.url = 'http://api.openweathermap.org/data/2.5/forecast'
-        self.params = {
-            'q': self.location,
-            'appid': self.api_key,
-            'units': 'metric'  # Use 'metric' for Celsius, 'imperial' for Fahrenheit
-        }
+    def __init__(self, location=None, mode='daily', days=3, source=None):
+        self.location = location or input("Enter the location for weather forecast: ")
+        self.units = 'metric'  # Use 'metric' for Celsius, 'imperial' for Fahrenheit
+        self.source = source or HTTPSource()
+        self.mode = mode  # 'daily' keeps the first forecast of each day, 'series' every 3-hourly entry
+        self.days = days
+        self.label_format = '%a %d %b %H:%M' if mode == 'series' else '%A, %d %B %Y'
     
     def weather_data(self):
-        response = requests.get(self.url, self.params)
-        if response.status_code == 200:
-            data = response.json()
-        else:
+        try:
+            data = self.source.fetch(self.location, self.units)
+        except FetchError:
             print("Failed to fetch weather data.")
             return
 
@@ -27,70 +31,68 @@ class Skylitics:
             print("No weather data available.")
             return
         
-        current_date = datetime.utcnow().date()
-        forecast_days = [current_date, current_date + timedelta(days=1), current_date + timedelta(days=2)]
-
-        # Filter forecast data to get the first instance of each day
-        daily_forecasts = {}
-        for item in data['list']:
-            forecast_time = datetime.utcfromtimestamp(item['dt'])
-            forecast_date = forecast_time.date()
-
-            # Store only one forecast per day (the first occurrence)
-            if forecast_date in forecast_days and forecast_date not in daily_forecasts:
-                daily_forecasts[forecast_date] = item
+        # Parse once into columns, then keep the entries for today and the following days
+        daily_forecasts = self.select(ForecastColumns.from_payload(data))
 
         # Call plotting functions
-        self.plot_bar_chart(daily_forecasts)
-        self.plot_pie_chart(daily_forecasts)
-        self.plot_gauge_chart(daily_forecasts)
-        self.plot_box_plot(daily_forecasts)
-        self.plot_heatmap(daily_forecasts)
-        self.plot_wind_polar(daily_forecasts)
-        self.plot_pressure_line(daily_forecasts)
-        self.plot_combined_chart(daily_forecasts)
+        for fig in self.create_figures(daily_forecasts):
+            fig.show()
+
+    def export(self, directory, fmt='html'):
+        # Headless: write the figures to `directory` instead of opening browser tabs
+        data = self.source.fetch(self.location, self.units)
+        if not data:
+            raise FetchError("No weather data available.")
+        daily_forecasts = self.select(ForecastColumns.from_payload(data))
+        return write_figures(self.create_figures(daily_forecasts), directory, self.location, fmt)
+
+    def create_figures(self, daily_forecasts):
+        return [
+            self.plot_bar_chart(daily_forecasts),
+            self.plot_pie_chart(daily_forecasts),
+            self.plot_gauge_chart(daily_forecasts),
+            self.plot_box_plot(daily_forecasts),
+            self.plot_heatmap(daily_forecasts),
+            self.plot_wind_polar(daily_forecasts),
+            self.plot_pressure_line(daily_forecasts),
+            self.plot_combined_chart(daily_forecasts)
+        ]
         
+    def select(self, columns):
+        if self.mode == 'series':
+            return series(columns, self.days)
+        return first_per_day(columns, self.days)
+
     # 1. Bar Chart for Temperature and Humidity
     def plot_bar_chart(self, daily_forecasts):
-        dates = []
-        temps = []
-        humidities = []
-
-        for forecast_date, forecast in daily_forecasts.items():
-            dates.append(forecast_date.strftime('%A, %d %B %Y'))
-            temps.append(forecast['main']['temp'])
-            humidities.append(forecast['main']['humidity'])
+        dates = daily_forecasts.labels(self.label_format)
 
         fig = go.Figure(data=[
-            go.Bar(name='Temperature (°C)', x=dates, y=temps, marker_color='blue'),
-            go.Bar(name='Humidity (%)', x=dates, y=humidities, marker_color='orange')
+            go.Bar(name='Temperature (°C)', x=dates, y=daily_forecasts.temp, marker_color='blue'),
+            go.Bar(name='Humidity (%)', x=dates, y=daily_forecasts.humidity, marker_color='orange')
         ])
 
         fig.update_layout(
-            title="Temperature and Humidity for the Next 3 Days",
+            title=f"Temperature and Humidity for the Next {self.days} Days",
             barmode='group',
             xaxis_title="Date",
             yaxis_title="Value",
             template="plotly_dark"
         )
 
-        fig.show()
+        return fig
 
     # 2. Pie Chart for Weather Conditions
     def plot_pie_chart(self, daily_forecasts):
-        weather_conditions = {}
-
-        for forecast_date, forecast in daily_forecasts.items():
-            condition = forecast['weather'][0]['description']
-            weather_conditions[condition] = weather_conditions.get(condition, 0) + 1
+        weather_conditions = daily_forecasts.condition_counts()
 
         fig = go.Figure(data=[go.Pie(labels=list(weather_conditions.keys()), values=list(weather_conditions.values()))])
-        fig.update_layout(title="Weather Condition Distribution for the Next 3 Days")
-        fig.show()
+        fig.update_layout(title=f"Weather Condition Distribution for the Next {self.days} Days")
+        return fig
 
     # 3. Gauge Chart for Humidity Levels
     def plot_gauge_chart(self, daily_forecasts):
-        current_humidity = daily_forecasts[list(daily_forecasts.keys())[0]]['main']['humidity']
+        current_humidity = float(daily_forecasts.humidity[0])
 
         fig = go.Figure(go.Indicator(
             mode="gauge+number",
@@ -99,43 +101,33 @@ class Skylitics:
             gauge={'axis': {'range': [0, 100]}, 'bar': {'color': "blue"}}
         ))
 
-        fig.show()
+        return fig
 
     # 4. Box Plot for Temperature Variability
     def plot_box_plot(self, daily_forecasts):
-        temps = [forecast['main']['temp'] for forecast in daily_forecasts.values()]
-
-        fig = go.Figure(data=[go.Box(y=temps, boxmean=True)])
-        fig.update_layout(title="Temperature Variability for the Next 3 Days", yaxis_title="Temperature (°C)")
-        fig.show()
+        fig = go.Figure(data=[go.Box(y=daily_forecasts.temp, boxmean=True)])
+        fig.update_layout(title=f"Temperature Variability for the Next {self.days} Days", yaxis_title="Temperature (°C)")
+        return fig
 
     # 5. Heatmap for Temperature and Humidity
     def plot_heatmap(self, daily_forecasts):
-        dates = list(daily_forecasts.keys())
-        temps = [forecast['main']['temp'] for forecast in daily_forecasts.values()]
-        humidities = [forecast['main']['humidity'] for forecast in daily_forecasts.values()]
-
-        # Create the heatmap matrix (rows = days, cols = temp and humidity)
-        data = np.array([temps, humidities])
+        # Create the heatmap matrix (rows = temp and humidity, cols = days)
+        data = np.vstack([daily_forecasts.temp, daily_forecasts.humidity])
 
         fig = go.Figure(data=go.Heatmap(
             z=data,
-            x=dates,
+            x=daily_forecasts.times() if self.mode == 'series' else daily_forecasts.dates(),
             y=["Temperature (°C)", "Humidity (%)"],
             colorscale='Viridis'
         ))
 
-        fig.update_layout(title="Temperature and Humidity Heatmap for the Next 3 Days")
-        fig.show()
+        fig.update_layout(title=f"Temperature and Humidity Heatmap for the Next {self.days} Days")
+        return fig
     
     # 6. Polar Bar Chart for Wind Speed and Direction
     def plot_wind_polar(self, daily_forecasts):
-        directions = []
-        speeds = []
-
-        for forecast_date, forecast in daily_forecasts.items():
-            directions.append(forecast['wind']['deg'])  # Wind direction in degrees
-            speeds.append(forecast['wind']['speed'])    # Wind speed in m/s
+        directions = daily_forecasts.wind_deg  # Wind direction in degrees
+        speeds = daily_forecasts.wind_speed      # Wind speed in m/s
 
         fig = go.Figure(
             data=go.Barpolar(
@@ -154,43 +146,31 @@ class Skylitics:
                 radialaxis=dict(angle=45, gridcolor="gray")
             )
         )
-        fig.show()
+        return fig
     
     # 7. Line Chart for Atmospheric Pressure
     def plot_pressure_line(self, daily_forecasts):
-        dates = []
-        pressures = []
-
-        for forecast_date, forecast in daily_forecasts.items():
-            dates.append(forecast_date.strftime('%A, %d %B %Y'))
-            pressures.append(forecast['main']['pressure'])
-
         fig = go.Figure(
             data=go.Scatter(
-                x=dates,
-                y=pressures,
+                x=daily_forecasts.labels(self.label_format),
+                y=daily_forecasts.pressure,
                 mode='lines+markers',
                 line=dict(color='purple')
             )
         )
         fig.update_layout(
-            title="Atmospheric Pressure Over the Next 3 Days",
+            title=f"Atmospheric Pressure Over the Next {self.days} Days",
             xaxis_title="Date",
             yaxis_title="Pressure (hPa)",
             template="plotly_dark"
         )
-        fig.show()
+        return fig
     
     # 8. Plot Precipitation and Temperature
     def plot_combined_chart(self, daily_forecasts):
-        dates = []
-        temps = []
-        precip_probs = []
-
-        for forecast_date, forecast in daily_forecasts.items():
-            dates.append(forecast_date.strftime('%A, %d %B %Y'))
-            temps.append(forecast['main']['temp'])
-            precip_probs.append(forecast.get('pop', 0) * 100)  # Convert precipitation probability to percentage
+        dates = daily_forecasts.labels(self.label_format)
+        temps = daily_forecasts.temp
+        precip_probs = daily_forecasts.pop * 100  # Convert precipitation probability to percentage
 
         fig = go.Figure()
 
@@ -216,7 +196,7 @@ class Skylitics:
         # Update layout for dual y-axis and adjusted title/legend
         fig.update_layout(
             title=dict(
-                text="Precipitation Probability and Temperature Over the Next 3 Days",
+                text=f"Precipitation Probability and Temperature Over the Next {self.days} Days",
                 x=0.5,  # Center the title
                 y=0.95,  # Position title slightly above
                 font=dict(size=20)
@@ -243,8 +223,53 @@ class Skylitics:
             )
         )
 
-        fig.show()
+        return fig
+
+def add_arguments(parser):
+    parser.add_argument('locations', nargs='*', help='Prompted for when none are given')
+    parser.add_argument('-f', '--file', help="Read locations from this file, one per line ('-' for stdin)")
+    parser.add_argument('--export', metavar='DIRECTORY', help='Write the charts to this directory instead of showing them')
+    parser.add_argument('--format', choices=('html',) + IMAGE_FORMATS, default='html', dest='export_format',
+                        help='Images need the kaleido package')
+    parser.add_argument('--processes', type=int, help='Render processes (default: one per CPU)')
+    parser.add_argument('--mode', choices=['daily', 'series'], default='daily')
+    parser.add_argument('--days', type=int, default=3)
+
+
+def main(args):
+    from clime_cast import read_locations
+
+    if not args.export:
+        if args.file or len(args.locations) > 1:
+            # Eight browser tabs per location is not a useful way to see a list
+            print("error: several locations or -f/--file need --export DIRECTORY", file=sys.stderr)
+            return 2
+        # Interactive, as before: one location, shown in the browser
+        location = args.locations[0] if args.locations else None
+        Skylitics(location, mode=args.mode, days=args.days).weather_data()
+        return 0
+
+    if args.file and args.file != '-':
+        with open(args.file, encoding='utf-8') as lines:
+            return export_main(args, read_locations(lines))
+    if args.file == '-':
+        return export_main(args, read_locations(sys.stdin))
+    return export_main(args, args.locations)
+
+
+def export_main(args, locations):
+    failures = 0
+    results = export_locations(locations, args.export, args.export_format, args.mode, args.days, args.processes)
+    try:
+        for location, paths, error in results:
+            failures += bool(error)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 1 if failures else 0
+
 
 if __name__ == '__main__':
-    forecast = Skylitics()
-    forecast.weather_data()
+    parser = argparse.ArgumentParser(description='Show or export weather forecast charts.')
+    add_arguments(parser)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+import argparse
+import sys
+
+# One entry point for the three scripts. Each command imports only what it needs, so
+# `python -m skyscope forecast` never loads NumPy, Plotly or Dash.
+
+
+def forecast(args):
+    import clime_cast
+    return clime_cast.main(args)
+
+
+def charts(args):
+    import clime_charts
+    return clime_charts.main(args)
+
+
+def dashboard(args):
+    import skyscope_dashboard
+    from skyscope.locations import LocationResolver
+    from skyscope.store import ForecastStore
+    store = ForecastStore(args.store) if args.store else None
+    locations = LocationResolver(args.locations) if args.locations else None
+    skyscope_dashboard.Skylitics(
+        mode=args.mode, days=args.days, compact=args.compact, store=store, locations=locations,
+        clientside=args.clientside
+    ).run(debug=args.debug)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m skyscope', description='SkyScope weather forecasts.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('forecast', help='Print forecasts as text, JSON Lines or CSV')
+    import clime_cast  # Cheap: only the standard library and the skyscope core
+    clime_cast.add_arguments(command)
+    command.set_defaults(run=forecast)
+
+    command = commands.add_parser('charts', help='Open the forecast charts in the browser, or export them')
+    import clime_charts  # Plotly and NumPy load lazily, on the first chart
+    clime_charts.add_arguments(command)
+    command.set_defaults(run=charts)
+
+    command = commands.add_parser('dashboard', help='Run the Dash development server')
+    command.add_argument('--compact', action='store_true', help='All charts in one subplot figure')
+    command.add_argument('--clientside', action='store_true',
+                         help='Build the charts in the browser; units, days and charts change without a round trip')
+    command.add_argument('--debug', action='store_true')
+    command.add_argument('--store', metavar='PATH', help='Keep forecast history in this SQLite file')
+    command.add_argument('--locations', metavar='PATH', help='Keep resolved locations in this SQLite file')
+    command.add_argument('--mode', choices=['daily', 'series'], default='daily')
+    command.add_argument('--days', type=int, default=3)
+    command.set_defaults(run=dashboard)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from skyscope.client import FetchClient
+from skyscope.forecast import daily_forecasts
+from skyscope.scheduler import BATCH, upstream_priority
+from skyscope.sources import FetchError, HTTPSource
+
+BatchResult = namedtuple('BatchResult', ['location', 'city', 'daily_forecasts', 'error'])
+
+_DONE = object()
+
+
+class BatchFetcher:
+
+    # Upstream calls are paced by the process's UpstreamScheduler (skyscope/scheduler.py),
+    # at batch priority; `concurrency` only bounds the fetches in flight
+
+    def __init__(self, source=None, units='metric', concurrency=10, days=3):
+        self.source = source or HTTPSource(client=FetchClient(pool_size=concurrency))
+        self.units = units
+        self.concurrency = concurrency
+        self.days = days
+
+    def fetch_batch(self, location):
+        # Runs in an executor thread, behind any interactive calls for the same quota
+        with upstream_priority(BATCH):
+            return self.source.fetch(location, self.units)
+
+    async def fetch(self, location, executor=None):
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(executor, self.fetch_batch, location)
+            if not data:
+                return BatchResult(location, None, None, "No weather data available.")
+            return BatchResult(location, data['city'], daily_forecasts(data['list'], self.days), None)
+        except FetchError as error:
+            return BatchResult(location, None, None, str(error))
+        except Exception as error:
+            # One bad location must not end the stream for all the others
+            return BatchResult(location, None, None, f"{type(error).__name__}: {error}")
+
+    async def stream(self, locations):
+        # Yields a BatchResult per location as soon as its fetch completes
+        locations = iter(locations)
+        queue = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker(executor):
+            for location in locations:
+                await queue.put(await self.fetch(location, executor))
+
+        async def finish(workers):
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                await queue.put(_DONE)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            workers = [asyncio.ensure_future(worker(executor)) for _ in range(self.concurrency)]
+            finisher = asyncio.ensure_future(finish(workers))
+            try:
+                while True:
+                    result = await queue.get()
+                    if result is _DONE:
+                        break
+                    yield result
+                await finisher
+            finally:
+                for task in workers + [finisher]:
+                    task.cancel()
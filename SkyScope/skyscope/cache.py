@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_location(location):
+    # "  new   york , US" and "New York,us" should share one cache entry
+    parts = [' '.join(part.split()) for part in location.split(',')]
+    return ','.join(part for part in parts if part).lower()
+
+
+def forecast_key(location, units='metric'):
+    return (normalize_location(location), units)
+
+
+class ForecastCache:
+
+    def __init__(self, maxsize=128, ttl=3 * 60 * 60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl  # Seconds; the upstream forecast only changes every 3 hours
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+
+            # Drop the least recently used entries once we are over capacity
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key, produce, since=None):
+        # Only this process writes here, so when a refresh passes `since` the entry is the
+        # stale one being replaced
+        value = self.get(key) if since is None else None
+        if value is None:
+            value = produce()
+            if value:
+                self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+
+from skyscope.lazy import lazy_import
+
+# Loaded with the first client, so a forecast served from disk never imports it
+requests = lazy_import('requests')
+
+# Rate limiting and transient upstream failures are worth another attempt
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class FetchClient:
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10,
+                 retries=3, backoff=0.5, max_backoff=8.0):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        # One keep-alive session so repeat requests reuse pooled connections
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, params=None, stream=False, scheduler=None):
+        # With stream=True the body is read later, e.g. through response.iter_content().
+        # An UpstreamScheduler admits every attempt, retries included, against the quota.
+        timeout = (self.connect_timeout, self.read_timeout)
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            if scheduler is not None:
+                scheduler.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                retry_after = response.headers.get('Retry-After')
+                response.close()
+                if response.status_code == 429 and scheduler is not None:
+                    # Pause every caller sharing the quota, not just this one; acquire() waits it out
+                    scheduler.throttle(self.backoff_delay(attempt, retry_after))
+                    continue
+
+            time.sleep(self.backoff_delay(attempt, retry_after))
+
+    def backoff_delay(self, attempt, retry_after=None):
+        # Honour the server's Retry-After hint when it gives one in seconds
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+
+        # Full jitter keeps retrying workers from hitting the upstream in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def shared_client(**options):
+    # Every Skylitics instance in the process shares one connection pool
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = FetchClient(**options)
+        return _shared_client
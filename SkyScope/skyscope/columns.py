@@ -0,0 +1,183 @@
+from collections import namedtuple
+from datetime import datetime
+
+from skyscope.forecast import FORECAST_STEP
+from skyscope.lazy import lazy_import
+from skyscope.parse import ForecastArrays
+
+np = lazy_import('numpy')
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+DailyAggregates = namedtuple('DailyAggregates', [
+    'date', 'count', 'temp_min', 'temp_max', 'temp_mean', 'humidity_mean',
+    'pressure_mean', 'wind_speed_max', 'pop_max', 'pop_sum',
+])
+
+# Location x time arrays for comparing cities; gaps in a city's forecast are NaN
+LocationGrid = namedtuple('LocationGrid', [
+    'locations', 'dt', 'temp', 'humidity', 'pressure', 'wind_speed', 'pop',
+])
+
+_GRID_FIELDS = LocationGrid._fields[2:]
+
+
+class ForecastColumns:
+    # One array per forecast field, with weather descriptions stored as codes into `conditions`
+
+    __slots__ = ('dt', 'temp', 'humidity', 'pressure', 'wind_speed', 'wind_deg', 'pop',
+                 'weather', 'conditions')
+
+    def __init__(self, dt, temp, humidity, pressure, wind_speed, wind_deg, pop, weather, conditions):
+        self.dt = dt
+        self.temp = temp
+        self.humidity = humidity
+        self.pressure = pressure
+        self.wind_speed = wind_speed
+        self.wind_deg = wind_deg
+        self.pop = pop
+        self.weather = weather
+        self.conditions = conditions
+
+    @classmethod
+    def from_payload(cls, data):
+        # Streamed responses already hold their columns; cached and replayed dicts are parsed
+        if isinstance(data, ForecastArrays):
+            return data.columns()
+        return cls.from_list(data['list'])
+
+    @classmethod
+    def from_list(cls, items):
+        # Parse the raw data['list'] payload once into compact arrays
+        count = len(items)
+        dt = np.empty(count, dtype=np.int64)
+        temp = np.empty(count)
+        humidity = np.empty(count)
+        pressure = np.empty(count)
+        wind_speed = np.empty(count)
+        wind_deg = np.empty(count)
+        pop = np.empty(count)
+        weather = np.empty(count, dtype=np.int16)
+        codes = {}
+
+        for i, item in enumerate(items):
+            main = item['main']
+            wind = item['wind']
+            dt[i] = item['dt']
+            temp[i] = main['temp']
+            humidity[i] = main['humidity']
+            pressure[i] = main['pressure']
+            wind_speed[i] = wind['speed']
+            wind_deg[i] = wind['deg']
+            pop[i] = item.get('pop', 0)
+            weather[i] = codes.setdefault(item['weather'][0]['description'], len(codes))
+
+        return cls(dt, temp, humidity, pressure, wind_speed, wind_deg, pop, weather, list(codes))
+
+    @classmethod
+    def from_rows(cls, rows):
+        # Rows of (dt, temp, humidity, pressure, wind_speed, wind_deg, pop, description), e.g. from SQLite
+        codes = {}
+        weather = [codes.setdefault(row[7], len(codes)) for row in rows]
+        fields = list(zip(*rows))[:7] if rows else [()] * 7
+        return cls(
+            np.array(fields[0], dtype=np.int64), *(np.array(field, dtype=float) for field in fields[1:]),
+            np.array(weather, dtype=np.int16), list(codes)
+        )
+
+    def take(self, index):
+        return ForecastColumns(
+            self.dt[index], self.temp[index], self.humidity[index], self.pressure[index],
+            self.wind_speed[index], self.wind_deg[index], self.pop[index], self.weather[index],
+            self.conditions
+        )
+
+    def days(self):
+        # Days since the epoch, in UTC
+        return self.dt // SECONDS_PER_DAY
+
+    def dates(self):
+        return self.days().astype('datetime64[D]')
+
+    def times(self):
+        return self.dt.astype('datetime64[s]')
+
+    def labels(self, fmt='%A, %d %B %Y'):
+        return [datetime.utcfromtimestamp(int(value)).strftime(fmt) for value in self.dt]
+
+    def condition_counts(self):
+        counts = np.bincount(self.weather, minlength=len(self.conditions))
+        return {condition: int(count) for condition, count in zip(self.conditions, counts) if count}
+
+    def __len__(self):
+        return len(self.dt)
+
+
+def _in_range(columns, days, today):
+    if today is None:
+        today = datetime.utcnow().date()
+    first_day = (today - datetime(1970, 1, 1).date()).days
+
+    day = columns.days()
+    return np.flatnonzero((day >= first_day) & (day < first_day + days))
+
+
+def first_per_day(columns, days=3, today=None):
+    # Vectorized version of forecast.daily_forecasts: the first entry for each of `days` days
+    in_range = _in_range(columns, days, today)
+    _, first = np.unique(columns.days()[in_range], return_index=True)
+    return columns.take(in_range[first])
+
+
+def series(columns, days=5, today=None):
+    # Every 3-hourly entry within the next `days` days
+    return columns.take(_in_range(columns, days, today))
+
+
+def daily_aggregate(columns, days=5, today=None):
+    # Per-day min/max/mean in one pass over the sorted timestamp array
+    selected = series(columns, days, today)
+    order = np.argsort(selected.dt, kind='stable')
+    day = selected.days()[order]
+    if not len(day):
+        empty = np.empty(0)
+        return DailyAggregates(day.astype('datetime64[D]'), np.empty(0, dtype=np.int64), *[empty] * 8)
+
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    count = np.diff(np.r_[starts, len(day)])
+    temp = selected.temp[order]
+    pop = selected.pop[order]
+
+    return DailyAggregates(
+        date=day[starts].astype('datetime64[D]'),
+        count=count,
+        temp_min=np.minimum.reduceat(temp, starts),
+        temp_max=np.maximum.reduceat(temp, starts),
+        temp_mean=np.add.reduceat(temp, starts) / count,
+        humidity_mean=np.add.reduceat(selected.humidity[order], starts) / count,
+        pressure_mean=np.add.reduceat(selected.pressure[order], starts) / count,
+        wind_speed_max=np.maximum.reduceat(selected.wind_speed[order], starts),
+        pop_max=np.maximum.reduceat(pop, starts),
+        pop_sum=np.add.reduceat(pop, starts),
+    )
+
+
+def stack_locations(locations, columns, step=FORECAST_STEP):
+    # Aligns each location's series on one shared time axis in a single scatter per field
+    lengths = [len(column.dt) for column in columns]
+    if not sum(lengths):
+        empty = np.empty((len(locations), 0))
+        return LocationGrid(list(locations), np.empty(0, dtype=np.int64), *[empty] * len(_GRID_FIELDS))
+
+    dt = np.concatenate([column.dt for column in columns])
+    start = dt.min() // step * step
+    times = np.arange(start, dt.max() + step, step, dtype=np.int64)
+    rows = np.repeat(np.arange(len(columns)), lengths)
+    cells = (dt - start) // step
+
+    grids = []
+    for name in _GRID_FIELDS:
+        grid = np.full((len(columns), len(times)), np.nan)
+        grid[rows, cells] = np.concatenate([getattr(column, name) for column in columns])
+        grids.append(grid)
+    return LocationGrid(list(locations), times, *grids)
@@ -0,0 +1,120 @@
+import html
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from skyscope.lazy import lazy_import
+from skyscope.scheduler import BATCH, share_quota, upstream_priority
+from skyscope.sources import FetchError, location_slug
+
+pio = lazy_import('plotly.io')
+
+# File names of the figures clime_charts.Skylitics.create_figures returns, in order
+CHART_NAMES = ['bar', 'pie', 'gauge', 'box', 'heatmap', 'polar', 'pressure', 'combined']
+
+IMAGE_FORMATS = ('png', 'jpg', 'svg', 'pdf')
+
+PLOTLYJS = 'plotly.min.js'
+
+_PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotlyjs}"></script>
+</head>
+<body style="background-color: #222; color: #eee; font-family: sans-serif">
+<h1 style="text-align: center">{title}</h1>
+{charts}
+</body>
+</html>
+'''
+
+
+def write_plotlyjs(directory):
+    # Every exported page references this one bundle instead of embedding 3 MB of plotly.js
+    path = os.path.join(directory, PLOTLYJS)
+    if not os.path.exists(path):
+        from plotly.offline import get_plotlyjs
+        with open(path, 'w', encoding='utf-8') as bundle:
+            bundle.write(get_plotlyjs())
+    return path
+
+
+def write_figures(figures, directory, location, fmt='html'):
+    # HTML: one page per location with every chart. Images: <location>/<chart>.<fmt>
+    slug = location_slug(location)
+    if fmt == 'html':
+        charts = '\n'.join(
+            pio.to_html(fig, full_html=False, include_plotlyjs=False, validate=False) for fig in figures
+        )
+        path = os.path.join(directory, f'{slug}.html')
+        with open(path, 'w', encoding='utf-8') as page:
+            page.write(_PAGE.format(title=html.escape(f"Weather forecast for {location}"), plotlyjs=PLOTLYJS, charts=charts))
+        return [path]
+
+    os.makedirs(os.path.join(directory, slug), exist_ok=True)
+    paths = []
+    for name, fig in zip(CHART_NAMES, figures):
+        path = os.path.join(directory, slug, f'{name}.{fmt}')
+        pio.write_image(fig, path, format=fmt, validate=False)
+        paths.append(path)
+    return paths
+
+
+def export_location(location, directory, fmt, mode, days, source):
+    # Runs in a worker process: fetch, build and write one location's figures
+    import clime_charts
+    charts = clime_charts.Skylitics(location, mode=mode, days=days, source=source)
+    try:
+        with upstream_priority(BATCH):
+            return location, charts.export(directory, fmt), None
+    except FetchError as error:
+        return location, [], str(error)
+    except Exception as error:
+        # e.g. a forecast with no entries in the horizon; the other locations still export
+        return location, [], f"{type(error).__name__}: {error}"
+
+
+def export_locations(locations, directory, fmt='html', mode='daily', days=3, processes=None, source=None,
+                     progress=sys.stderr):
+    # Yields (location, paths, error) as each location finishes. At most two tasks per process
+    # are queued at a time, so location lists of any length use bounded memory.
+    # `source` is pickled to each worker; by default each builds its own HTTPSource.
+    if fmt not in ('html',) + IMAGE_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt != 'html':
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            raise RuntimeError("Image export requires the kaleido package (pip install kaleido)") from None
+
+    os.makedirs(directory, exist_ok=True)
+    if fmt == 'html':
+        write_plotlyjs(directory)
+
+    processes = processes or os.cpu_count() or 1
+    locations = iter(locations)
+    start = time.perf_counter()
+    done = 0
+    # Each worker process gets an equal share of the upstream quota
+    with ProcessPoolExecutor(max_workers=processes, initializer=share_quota, initargs=(processes,)) as pool:
+        pending = set()
+        while True:
+            for location in locations:
+                pending.add(pool.submit(export_location, location, directory, fmt, mode, days, source))
+                if len(pending) >= 2 * processes:
+                    break
+            if not pending:
+                break
+
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                location, paths, error = future.result()
+                done += 1
+                if progress is not None:
+                    rate = done / (time.perf_counter() - start)
+                    status = f"failed: {error}" if error else f"{len(paths)} file(s)"
+                    print(f"[{done}] {location}: {status} ({rate:.1f} locations/s)", file=progress, flush=True)
+                yield location, paths, error
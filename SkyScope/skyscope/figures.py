@@ -0,0 +1,49 @@
+import hashlib
+
+from skyscope.lazy import lazy_import
+
+go = lazy_import('plotly.graph_objects')
+pio = lazy_import('plotly.io')
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Only the layout colours of a template matter to our charts; the per-trace defaults
+# make up most of its serialized size
+_TEMPLATE_KEYS = ('font', 'paper_bgcolor', 'plot_bgcolor', 'colorway', 'title', 'xaxis', 'yaxis', 'polar')
+_slim_templates = {}
+
+
+def slim_template(name='plotly_dark'):
+    if name not in _slim_templates:
+        layout = pio.templates[name].layout.to_plotly_json()
+        _slim_templates[name] = go.layout.Template(
+            layout={key: layout[key] for key in _TEMPLATE_KEYS if key in layout}
+        )
+    return _slim_templates[name]
+
+
+def figure_json(fig):
+    # Serialize without re-validating; orjson handles NumPy arrays natively when installed.
+    # For the payload benchmarks only: Dash serializes callback responses itself.
+    return pio.to_json(fig, validate=False, engine='orjson' if orjson is not None else 'json')
+
+
+def grid_hash(grid, *options):
+    # Identifies the comparison figures built from a LocationGrid
+    digest = hashlib.blake2b(digest_size=16)
+    for name in grid._fields[1:]:
+        digest.update(getattr(grid, name).tobytes())
+    digest.update(repr((grid.locations, options)).encode())
+    return digest.hexdigest()
+
+
+def forecast_hash(columns, *options):
+    # Identifies the figures built from these arrays with these chart options
+    digest = hashlib.blake2b(digest_size=16)
+    for name in ('dt', 'temp', 'humidity', 'pressure', 'wind_speed', 'wind_deg', 'pop', 'weather'):
+        digest.update(getattr(columns, name).tobytes())
+    digest.update(repr((columns.conditions, options)).encode())
+    return digest.hexdigest()
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+FORECAST_STEP = 3 * 60 * 60  # OpenWeatherMap publishes a new forecast every 3 hours
+
+
+def daily_forecasts(items, days=3, today=None):
+    if today is None:
+        today = datetime.utcnow().date()
+    forecast_days = [today + timedelta(days=offset) for offset in range(days)]
+
+    # Filter forecast data to get the first instance of each day
+    daily = {}
+    for item in items:
+        forecast_time = datetime.utcfromtimestamp(item['dt'])
+        forecast_date = forecast_time.date()
+
+        # Store only one forecast per day (the first occurrence)
+        if forecast_date in forecast_days and forecast_date not in daily:
+            daily[forecast_date] = item
+
+    return daily
+
+
+def compact_forecast(data):
+    # Keep only the fields SkyScope reads, for caches that store serialized forecasts
+    return {
+        'city': data['city'],
+        'list': [
+            {
+                'dt': item['dt'],
+                'main': {key: item['main'][key] for key in ('temp', 'humidity', 'pressure')},
+                'weather': [{'description': item['weather'][0]['description']}],
+                'wind': {key: item['wind'][key] for key in ('speed', 'deg')},
+                'pop': item.get('pop', 0),
+            }
+            for item in data['list']
+        ],
+    }
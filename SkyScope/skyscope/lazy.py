@@ -0,0 +1,29 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    # Stands in for a module until its first attribute access. Unlike importlib's LazyLoader it
+    # is safe when several threads touch the module first at the same time.
+
+    def __getattr__(self, attr):
+        with _lock:
+            module = importlib.import_module(self.__name__)
+            # Later lookups find the module's attributes directly, without this method
+            self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    # Returns the module at once but only runs it on first attribute access, so scripts that
+    # never draw a chart never pay for numpy, plotly or dash
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    return _LazyModule(name)
@@ -0,0 +1,199 @@
+import sqlite3
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import OrderedDict, namedtuple
+
+from skyscope.cache import normalize_location
+
+City = namedtuple('City', ['id', 'name', 'country', 'lat', 'lon'])
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS cities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    country TEXT NOT NULL,
+    lat REAL,
+    lon REAL
+);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    city_id INTEGER NOT NULL,
+    used_at INTEGER NOT NULL
+);
+'''
+
+
+def fold(text):
+    # Case- and accent-insensitive form used for matching: "São Paulo" -> "sao paulo"
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).lower().split())
+
+
+def canonical_query(city):
+    # "id:2643743" for the city block {"id": 2643743, "name": "London", ...}. Names are ambiguous
+    # even within a country ("Portland,US" is Oregon or Maine); the upstream's city ID is not.
+    return f"id:{city.id}"
+
+
+def city_id(location):
+    # The city ID of a canonical query, or None for a location as typed
+    prefix, _, number = normalize_location(location).partition(':')
+    return int(number) if prefix == 'id' and number.isdigit() else None
+
+
+class LocationResolver:
+    # Maps what users type to the city the upstream resolved it to, using the `city` block of
+    # each forecast. "london", "London" and "London,GB" then share one canonical query, the
+    # city ID, and one cache entry. Bounded to `maxsize` aliases, least recently used first out, and persisted
+    # to SQLite when `path` is given.
+
+    def __init__(self, path=None, maxsize=10000):
+        self.path = path
+        self.maxsize = maxsize
+        self.resolved = 0
+        self.unresolved = 0
+        self._aliases = OrderedDict()  # alias -> city id, oldest first
+        self._cities = {}
+        self._uses = {}  # city id -> number of aliases pointing at it
+        self._index = []  # Sorted (folded name or word suffix, city id) pairs for prefix lookups
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.executescript(_SCHEMA)
+            self._load()
+
+    def _load(self):
+        for row in self._db.execute('SELECT id, name, country, lat, lon FROM cities'):
+            self._cities[row[0]] = City(*row)
+        for alias, city_id in self._db.execute('SELECT alias, city_id FROM aliases ORDER BY used_at'):
+            if city_id in self._cities:
+                self._add_alias(alias, city_id)
+        for city_id in list(self._cities):
+            if city_id in self._uses:
+                self._add_to_index(self._cities[city_id])
+            else:
+                del self._cities[city_id]
+
+    def _index_keys(self, city):
+        words = fold(city.name).split()
+        # The full name and each later word, so "york" also finds "New York"
+        return {' '.join(words[i:]) for i in range(len(words))}
+
+    def _add_to_index(self, city):
+        for key in self._index_keys(city):
+            insort(self._index, (key, city.id))
+
+    def _remove_from_index(self, city):
+        for key in self._index_keys(city):
+            index = bisect_left(self._index, (key, city.id))
+            if index < len(self._index) and self._index[index] == (key, city.id):
+                del self._index[index]
+
+    def _add_alias(self, alias, city_id):
+        previous = self._aliases.pop(alias, None)
+        if previous is not None:
+            self._uses[previous] -= 1
+        self._aliases[alias] = city_id
+        self._uses[city_id] = self._uses.get(city_id, 0) + 1
+
+    def _evict(self):
+        # Returns the aliases and cities dropped to stay within maxsize
+        aliases, cities = [], []
+        while len(self._aliases) > self.maxsize:
+            alias, city_id = self._aliases.popitem(last=False)
+            aliases.append(alias)
+            self._uses[city_id] -= 1
+            if not self._uses[city_id]:
+                del self._uses[city_id]
+                city = self._cities.pop(city_id)
+                self._remove_from_index(city)
+                cities.append(city_id)
+        return aliases, cities
+
+    def resolve(self, location):
+        # The canonical query for a location seen before, else the location itself
+        alias = normalize_location(location)
+        with self._lock:
+            city_id = self._aliases.get(alias)
+            if city_id is None:
+                self.unresolved += 1
+                return location
+            self._aliases.move_to_end(alias)
+            self.resolved += 1
+            return canonical_query(self._cities[city_id])
+
+    def learn(self, location, city_block):
+        # Records which city the upstream returned for `location`; returns its canonical query
+        city = City(city_block['id'], city_block['name'], city_block.get('country', ''),
+                    city_block.get('coord', {}).get('lat'), city_block.get('coord', {}).get('lon'))
+        canonical = canonical_query(city)
+        aliases = {normalize_location(location), canonical}
+
+        with self._lock:
+            new = [alias for alias in aliases if self._aliases.get(alias) != city.id]
+            known = self._cities.get(city.id)
+            if not new and known == city:
+                for alias in aliases:
+                    self._aliases.move_to_end(alias)
+                return canonical
+
+            if known != city:
+                if known is not None:
+                    self._remove_from_index(known)
+                self._cities[city.id] = city
+                self._add_to_index(city)
+            for alias in new:
+                self._add_alias(alias, city.id)
+            evicted_aliases, evicted_cities = self._evict()
+
+            if self._db is not None:
+                with self._db:
+                    self._db.execute('INSERT OR REPLACE INTO cities VALUES (?, ?, ?, ?, ?)', city)
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO aliases VALUES (?, ?, strftime('%s', 'now'))",
+                        [(alias, city.id) for alias in new]
+                    )
+                    self._db.executemany('DELETE FROM aliases WHERE alias = ?', [(alias,) for alias in evicted_aliases])
+                    self._db.executemany('DELETE FROM cities WHERE id = ?', [(city_id,) for city_id in evicted_cities])
+        return canonical
+
+    def city(self, location):
+        alias = normalize_location(location)
+        with self._lock:
+            city_id = self._aliases.get(alias)
+            return self._cities.get(city_id) if city_id is not None else None
+
+    def suggest(self, prefix, limit=10):
+        # Known cities whose name, or a later word of it, starts with `prefix`; the cities
+        # reached through the most aliases come first
+        prefix = fold(prefix.split(',')[0])
+        if not prefix:
+            return []
+        with self._lock:
+            matches = set()
+            for key, city_id in self._index[bisect_left(self._index, (prefix,)):]:
+                if not key.startswith(prefix):
+                    break
+                matches.add(city_id)
+            cities = sorted((self._cities[city_id] for city_id in matches),
+                            key=lambda city: (-self._uses[city.id], city.name, city.country))
+        return [f"{city.name}, {city.country}" if city.country else city.name for city in cities[:limit]]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.resolved + self.unresolved
+            return {
+                'aliases': len(self._aliases),
+                'cities': len(self._cities),
+                'resolved': self.resolved,
+                'unresolved': self.unresolved,
+                'resolve_rate': self.resolved / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,67 @@
+import csv
+import json
+
+# One row per forecast day, in the order CSV columns are written
+FIELDS = ['location', 'city', 'country', 'date', 'dt', 'temp', 'humidity', 'weather',
+          'wind_speed', 'wind_deg', 'pressure', 'pop', 'units', 'error']
+
+
+def forecast_rows(result, units='metric'):
+    # Flattens a BatchResult into one dict per forecast day
+    city = result.city or {}
+    base = {'location': result.location, 'city': city.get('name'), 'country': city.get('country')}
+    for forecast_date, forecast in (result.daily_forecasts or {}).items():
+        yield dict(
+            base,
+            date=forecast_date.isoformat(),
+            dt=forecast['dt'],
+            temp=forecast['main']['temp'],
+            humidity=forecast['main']['humidity'],
+            weather=forecast['weather'][0]['description'],
+            wind_speed=forecast['wind']['speed'],
+            wind_deg=forecast['wind']['deg'],
+            pressure=forecast['main']['pressure'],
+            pop=forecast.get('pop', 0),
+            units=units,  # OpenWeatherMap units of temp and wind_speed
+            error=None,
+        )
+
+
+class JSONLinesWriter:
+    # One JSON object per location, written and flushed as soon as it completes
+
+    def __init__(self, out, units='metric'):
+        self.out = out
+        self.units = units
+
+    def write(self, result):
+        city = result.city or {}
+        record = {
+            'location': result.location,
+            'city': city.get('name'),
+            'country': city.get('country'),
+            'units': self.units,
+            'forecasts': [
+                {key: row[key] for key in FIELDS[3:-2]} for row in forecast_rows(result)
+            ],
+            'error': result.error,
+        }
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.out.flush()
+
+
+class CSVWriter:
+    # One row per location and day; a failed location gets a single row with its error
+
+    def __init__(self, out, units='metric'):
+        self.out = out
+        self.units = units
+        self.writer = csv.DictWriter(out, fieldnames=FIELDS)
+        self.writer.writeheader()
+
+    def write(self, result):
+        if result.error:
+            self.writer.writerow({'location': result.location, 'error': result.error})
+        else:
+            self.writer.writerows(forecast_rows(result, self.units))
+        self.out.flush()
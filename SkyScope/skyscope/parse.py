@@ -0,0 +1,206 @@
+import codecs
+import json
+import re
+from array import array
+from collections.abc import Mapping
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+# Top-level fields kept besides `list`; everything else is decoded and dropped
+_KEPT = ('cod', 'message', 'city')
+
+
+class ForecastArrays(Mapping):
+    # The fields SkyScope reads from a /forecast response, one compact array each. It is also a
+    # read-only mapping with the keys of a compact payload, so code written for dicts still
+    # works: data['city'], and data['list'], which builds the entry dicts on each access.
+
+    __slots__ = ('city', 'dt', 'temp', 'humidity', 'pressure', 'wind_speed', 'wind_deg', 'pop',
+                 'weather', 'conditions', '_codes')
+
+    def __init__(self, city=None):
+        self.city = city
+        self.dt = array('q')
+        self.temp = array('d')
+        # Whole numbers in the OpenWeatherMap API; widened to 'd' if a fractional value arrives
+        self.humidity = array('q')
+        self.pressure = array('q')
+        self.wind_speed = array('d')
+        self.wind_deg = array('q')
+        self.pop = array('d')
+        self.weather = array('h')
+        self.conditions = []
+        self._codes = {}
+
+    def _append(self, name, value):
+        column = getattr(self, name)
+        try:
+            column.append(value)
+        except TypeError:
+            column = array('d', column)
+            column.append(value)
+            setattr(self, name, column)
+
+    def append(self, item):
+        main = item['main']
+        wind = item['wind']
+        description = item['weather'][0]['description']
+        code = self._codes.get(description)
+        if code is None:
+            code = self._codes[description] = len(self.conditions)
+            self.conditions.append(description)
+
+        self.dt.append(item['dt'])
+        self.temp.append(main['temp'])
+        self._append('humidity', main['humidity'])
+        self._append('pressure', main['pressure'])
+        self.wind_speed.append(wind['speed'])
+        self._append('wind_deg', wind['deg'])
+        self.pop.append(item.get('pop', 0))
+        self.weather.append(code)
+
+    def __getitem__(self, key):
+        if key == 'city':
+            return self.city
+        if key == 'list':
+            return list(self.entries())
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(('city', 'list'))
+
+    def __len__(self):
+        return 2
+
+    def columns(self):
+        # ForecastColumns viewing these arrays; only whole-number columns are copied, to floats
+        from skyscope.columns import ForecastColumns, np
+
+        def view(column):
+            if column.typecode == 'd':
+                return np.frombuffer(column, dtype=np.float64)
+            return np.frombuffer(column, dtype=np.int64).astype(np.float64)
+
+        return ForecastColumns(
+            np.frombuffer(self.dt, dtype=np.int64),
+            *(view(getattr(self, name)) for name in ('temp', 'humidity', 'pressure', 'wind_speed', 'wind_deg', 'pop')),
+            np.frombuffer(self.weather, dtype=np.int16), list(self.conditions)
+        )
+
+    def entries(self):
+        # The `list` entries in the same shape as forecast.compact_forecast
+        for dt, temp, humidity, pressure, wind_speed, wind_deg, pop, code in zip(
+            self.dt, self.temp, self.humidity, self.pressure, self.wind_speed,
+            self.wind_deg, self.pop, self.weather
+        ):
+            yield {
+                'dt': dt,
+                'main': {'temp': temp, 'humidity': humidity, 'pressure': pressure},
+                'weather': [{'description': self.conditions[code]}],
+                'wind': {'speed': wind_speed, 'deg': wind_deg},
+                'pop': pop,
+            }
+
+    def to_payload(self):
+        # A plain dict, e.g. for json.dump
+        return {'city': self.city, 'list': list(self.entries())}
+
+
+class _Reader:
+    # Decodes JSON values one at a time from an iterable of byte chunks, holding
+    # roughly one chunk of text at a time
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        # Appends the next chunk, dropping the text already consumed; False at end of input
+        while not self.eof:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self.decoder.decode(b'', final=True)
+            else:
+                text = self.decoder.decode(chunk)
+            if text:
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected {char!r}, found {found!r}", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self.buffer) and not isinstance(value, (dict, list, str)) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self, close):
+        # Yields the values of the array or object members up to `close`
+        if self.peek() == close:
+            self.pos += 1
+            return
+        while True:
+            yield
+            separator = self.peek()
+            self.pos += 1
+            if separator == close:
+                return
+            if separator != ',':
+                raise json.JSONDecodeError(f"Expected ',' or {close!r}", self.buffer, self.pos - 1)
+
+
+def parse_forecast(chunks):
+    # Streams a /forecast response body into ForecastArrays. Only one `list` entry is held as a
+    # dict at any time, so peak memory no longer grows with the full decoded payload.
+    reader = _Reader(chunks)
+    forecast = ForecastArrays()
+    kept = {}
+
+    reader.expect('{')
+    for _ in reader.items('}'):
+        key = reader.value()
+        reader.expect(':')
+        if key == 'list':
+            reader.expect('[')
+            for _ in reader.items(']'):
+                forecast.append(reader.value())
+        elif key in _KEPT:
+            kept[key] = reader.value()
+        else:
+            reader.value()
+
+    forecast.city = kept.get('city')
+    return forecast
+
+
+def parse_forecast_bytes(body, chunk_size=64 * 1024):
+    # For bodies that are already in memory, e.g. replay fixtures
+    return parse_forecast(body[start:start + chunk_size] for start in range(0, len(body), chunk_size))
@@ -0,0 +1,199 @@
+import json
+import socket
+import threading
+import time
+import uuid
+import zlib
+from urllib.parse import urlparse
+
+from skyscope.forecast import compact_forecast
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisForecastCache:
+    # Forecast cache shared by every dashboard worker, stored in Redis or anything that
+    # speaks its protocol. Only GET, SET (PX/NX), DEL and SELECT are used.
+
+    def __init__(self, host='127.0.0.1', port=6379, db=0, ttl=6 * 60 * 60, prefix='skyscope:forecast:',
+                 timeout=1.0, lock_timeout=15.0, poll_interval=0.05, clock=time.time):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.ttl = ttl
+        self.prefix = prefix
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout  # Longest we wait for another worker's fetch
+        self.poll_interval = poll_interval
+        self.clock = clock  # Wall-clock time, so entries written by other workers compare
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.coalesced = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url, **options):
+        # redis://host:port/db
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip('/') or 0)
+        return cls(parsed.hostname or '127.0.0.1', parsed.port or 6379, db, **options)
+
+    def _key(self, key):
+        location, units = key
+        return f'{self.prefix}{units}:{location}'
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._local.sock = sock
+        self._local.reader = sock.makefile('rb')
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def _disconnect(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            self._local.reader.close()
+            sock.close()
+        self._local.sock = None
+
+    def _call(self, *args):
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        self._local.sock.sendall(b''.join(parts))
+        return self._read()
+
+    def _read(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RedisError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            return self._local.reader.read(length + 2)[:-2]
+        if kind == b'*':
+            return [self._read() for _ in range(int(rest))]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def command(self, *args):
+        # One reconnect attempt covers connections the server closed while idle
+        for attempt in range(2):
+            try:
+                if getattr(self._local, 'sock', None) is None:
+                    self._connect()
+                return self._call(*args)
+            except OSError:
+                self._disconnect()
+                if attempt:
+                    raise
+
+    def _load(self, key, since=None):
+        # The stored forecast, or None when there is none written at or after `since`
+        try:
+            raw = self.command('GET', self._key(key))
+        except (OSError, RedisError):
+            self._count('errors')
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(zlib.decompress(raw))
+        if 'stored_at' not in entry:
+            return None  # Written by an older version, without its age
+        if since is not None and entry['stored_at'] < since:
+            return None
+        return entry['forecast']
+
+    def get(self, key):
+        value = self._load(key)
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key, value):
+        entry = {'stored_at': self.clock(), 'forecast': compact_forecast(value)}
+        raw = zlib.compress(json.dumps(entry, separators=(',', ':')).encode())
+        try:
+            self.command('SET', self._key(key), raw, 'PX', int(self.ttl * 1000))
+        except (OSError, RedisError):
+            self._count('errors')
+
+    def get_or_set(self, key, produce, since=None):
+        # Entries written before `since` count as missing, so a background refresh reuses the
+        # forecast another worker already fetched for the new step instead of fetching it again
+        value = self._load(key, since)
+        self._count('hits' if value is not None else 'misses')
+        if value is not None:
+            return value
+
+        # Only the worker holding the lock goes upstream; the others wait for its result
+        lock_key = self._key(key) + ':lock'
+        token = uuid.uuid4().hex
+        try:
+            locked = self.command('SET', lock_key, token, 'NX', 'PX', int(self.lock_timeout * 1000)) == 'OK'
+        except (OSError, RedisError):
+            self._count('errors')
+            locked = True  # Without the shared store every worker fetches for itself
+
+        if not locked:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                value = self._load(key, since)
+                if value is not None:
+                    self._count('coalesced')
+                    return value
+                try:
+                    if self.command('GET', lock_key) is None:
+                        break  # The other worker gave up without storing a forecast
+                except (OSError, RedisError):
+                    break
+
+        try:
+            # A worker that stored the forecast may have released the lock just before we took it
+            value = self._load(key, since) if locked else None
+            if value is not None:
+                self._count('coalesced')
+                return value
+            value = produce()
+            if value:
+                self.set(key, value)
+        finally:
+            if locked:
+                try:
+                    if self.command('GET', lock_key) == token.encode():
+                        self.command('DEL', lock_key)
+                except (OSError, RedisError):
+                    pass
+        return value
+
+    def clear(self):
+        # Entries expire on their own; a shared cache is never flushed from one worker
+        pass
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'backend': 'redis',
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'coalesced': self.coalesced,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+            }
@@ -0,0 +1,169 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from skyscope.cache import ForecastCache
+from skyscope.forecast import FORECAST_STEP
+from skyscope.scheduler import BACKGROUND, upstream_priority
+
+
+class _Usage:
+    __slots__ = ('fetched_at', 'requests', 'last_requested')
+
+    def __init__(self, fetched_at):
+        self.fetched_at = fetched_at
+        self.requests = 1
+        self.last_requested = fetched_at
+
+
+class ForecastRefresher:
+
+    def __init__(self, fetch, cache=None, step=FORECAST_STEP, max_warm=50, workers=2,
+                 check_interval=60, idle_timeout=24 * 60 * 60, clock=time.time):
+        self.fetch = fetch  # fetch(key) -> data, or None when the upstream call fails
+        self.step = step
+        # Stale copies are still served for one extra step while a refresh is pending
+        self.cache = cache if cache is not None else ForecastCache(maxsize=256, ttl=2 * step)
+        self.max_warm = max_warm
+        self.workers = workers
+        self.check_interval = check_interval
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+
+        self.refreshes = 0
+        self.failures = 0
+        self.lags = deque(maxlen=256)
+        self._usage = {}
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def due_at(self, fetched_at):
+        # A forecast goes stale at the first step boundary after it was fetched
+        return (fetched_at // self.step + 1) * self.step
+
+    def get(self, key):
+        now = self.clock()
+        with self._lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                return None
+            usage.requests += 1
+            usage.last_requested = now
+            fetched_at = usage.fetched_at
+
+        # Serve the cached copy straight away and refresh it in the background
+        data = self.cache.get(key)
+        if data is not None and now >= self.due_at(fetched_at):
+            self.schedule(key)
+        return data
+
+    def put(self, key, data):
+        self.cache.set(key, data)
+        self.track(key)
+
+    def track(self, key):
+        # Start tracking a forecast that was just stored in the cache
+        now = self.clock()
+        with self._lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                self._usage[key] = _Usage(now)
+            else:
+                usage.fetched_at = now
+
+    def schedule(self, key):
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        self._queue.put(key)
+
+    def check(self):
+        # Keep the most frequently requested of the recently used locations warm
+        now = self.clock()
+        with self._lock:
+            for key in [key for key, usage in self._usage.items()
+                        if now - usage.last_requested > self.idle_timeout]:
+                del self._usage[key]
+
+            warm = sorted(self._usage.items(), key=lambda pair: (pair[1].requests, pair[1].last_requested),
+                          reverse=True)[:self.max_warm]
+            due = [key for key, usage in warm if now >= self.due_at(usage.fetched_at)]
+
+        for key in due:
+            self.schedule(key)
+
+    def _refresh(self, key):
+        with self._lock:
+            usage = self._usage.get(key)
+            due = self.due_at(usage.fetched_at) if usage else self.clock()
+
+        try:
+            # Users waiting on a Submit go upstream first. With a shared cache, the first
+            # worker to refresh takes its lock and the others pick up what it stored.
+            with upstream_priority(BACKGROUND):
+                data = self.cache.get_or_set(key, lambda: self.fetch(key), since=due)
+        except Exception:
+            data = None
+
+        with self._lock:
+            self._pending.discard(key)
+            if not data:
+                self.failures += 1
+                return
+            self.refreshes += 1
+            self.lags.append(max(0.0, self.clock() - due))
+        self.track(key)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                key = self._queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self._refresh(key)
+            finally:
+                self._queue.task_done()
+
+    def _schedule_loop(self):
+        while not self._stop.wait(self.check_interval):
+            self.check()
+
+    def start(self):
+        if self._threads:
+            return self
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._schedule_loop, daemon=True)]
+        self._threads += [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def metrics(self):
+        now = self.clock()
+        with self._lock:
+            staleness = [max(0.0, now - self.due_at(usage.fetched_at)) for usage in self._usage.values()]
+            lags = list(self.lags)
+            return {
+                'tracked': len(self._usage),
+                'queue_depth': self._queue.qsize(),
+                'pending': len(self._pending),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'stale': sum(1 for value in staleness if value > 0),
+                'max_staleness': max(staleness, default=0.0),
+                'mean_refresh_lag': sum(lags) / len(lags) if lags else 0.0,
+                'max_refresh_lag': max(lags, default=0.0),
+                'cache': self.cache.stats(),
+            }
@@ -0,0 +1,245 @@
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from urllib.parse import urlparse
+
+from skyscope.metrics import metrics
+
+# Upstream call priorities, most urgent first
+INTERACTIVE = 0  # A dashboard user is waiting for the answer
+BACKGROUND = 1   # Refreshing forecasts that are already cached
+BATCH = 2        # Batch forecasts and chart exports
+
+PRIORITY_NAMES = ['interactive', 'background', 'batch']
+
+# The OpenWeatherMap free plan: 60 calls a minute and 1,000,000 a month
+OPENWEATHERMAP_HOST = 'api.openweathermap.org'
+DEFAULT_PER_MINUTE = 60
+DEFAULT_PER_DAY = 1000000 // 31
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+_priority = contextvars.ContextVar('skyscope_upstream_priority', default=INTERACTIVE)
+
+
+class QuotaError(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def upstream_priority(priority):
+    # Upstream calls made inside the block, in this thread or task, are scheduled at `priority`
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    # `rate` tokens per `per` seconds, holding at most `capacity`; callers hold the scheduler lock
+
+    def __init__(self, rate, per, capacity=None, now=0.0):
+        self.rate = rate
+        self.per = per
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = float(self.capacity)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def wait(self, now, keep=0):
+        # Seconds until a token can be taken while `keep` tokens stay in the bucket
+        self.refill(now)
+        return max(0.0, (1 + keep - self.tokens) * self.per / self.rate)
+
+    def take(self):
+        self.tokens -= 1
+
+    def drain(self):
+        self.tokens = min(self.tokens, 0.0)
+
+
+def budget(limit, per, now):
+    # A bucket that never admits more than `limit` calls in any `per` seconds: bursts of up
+    # to a tenth of the limit, refilled at the rest of it
+    burst = max(1, limit // 10)
+    return TokenBucket(max(1, limit - burst), per, capacity=burst, now=now)
+
+
+class UpstreamScheduler:
+    # Admits upstream calls within per-minute and per-day budgets. Waiting calls are served
+    # in priority order, and background and batch calls leave `reserve` tokens of the minute
+    # bucket to interactive ones. Set per_minute or per_day to None for no limit.
+
+    def __init__(self, per_minute=DEFAULT_PER_MINUTE, per_day=DEFAULT_PER_DAY, reserve=None,
+                 max_queue=256, max_wait=10.0, clock=time.monotonic):
+        now = clock()
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.minute = budget(per_minute, 60.0, now) if per_minute else None
+        self.day = budget(per_day, SECONDS_PER_DAY, now) if per_day else None
+        burst = self.minute.capacity if self.minute is not None else 1
+        reserve = reserve if reserve is not None else burst // 2
+        self.reserve = max(0, min(reserve, burst - 1))  # Lower priorities must still fit under the burst
+        self.max_queue = max_queue  # Waiting background and batch calls; more block before queueing
+        self.max_wait = max_wait  # Longest an interactive call waits before it fails
+        self.clock = clock
+
+        self.calls = [0] * len(PRIORITY_NAMES)
+        self.rejected = 0
+        self.throttled = 0
+        self.paused_until = 0.0
+        self._made = deque()  # Times of the calls admitted in the last day, for remaining-quota gauges
+        self._waiting = []  # Heap of (priority, sequence)
+        self._deferred = 0  # Waiting calls below interactive priority
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _wait(self, priority, now):
+        waits = [self.paused_until - now]
+        if self.minute is not None:
+            waits.append(self.minute.wait(now, keep=self.reserve if priority > INTERACTIVE else 0))
+        if self.day is not None:
+            waits.append(self.day.wait(now))
+        return max(0.0, *waits)
+
+    def _reject(self, message):
+        self.rejected += 1
+        return QuotaError(message)
+
+    def acquire(self, priority=None):
+        # Blocks until one upstream call may be made; raises QuotaError for an interactive call
+        # that cannot be made within max_wait
+        priority = _priority.get() if priority is None else priority
+        start = self.clock()
+        deadline = start + self.max_wait if priority == INTERACTIVE and self.max_wait is not None else None
+
+        with self._condition:
+            if priority == INTERACTIVE:
+                if len(self._waiting) >= self.max_queue:
+                    raise self._reject(f"Upstream busy: {len(self._waiting)} calls waiting")
+            else:
+                # Backpressure: batch producers stall here instead of growing the queue
+                while self._deferred >= self.max_queue:
+                    self._condition.wait()
+                self._deferred += 1
+
+            entry = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = self.clock()
+                    first = self._waiting[0] == entry
+                    wait = self._wait(priority, now) if first else None
+                    if wait == 0:
+                        break
+                    if deadline is not None:
+                        if now >= deadline or (wait is not None and now + wait > deadline):
+                            raise self._reject(f"Upstream quota exhausted; next call in {self._wait(priority, now):.0f}s")
+                        wait = deadline - now if wait is None else wait
+                    # Only the first caller sleeps on the budget; the others wait for their turn
+                    self._condition.wait(wait)
+
+                if self.minute is not None:
+                    self.minute.take()
+                if self.day is not None:
+                    self.day.take()
+                self.calls[priority] += 1
+                self._made.append(now)
+                self._forget(now)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                if priority != INTERACTIVE:
+                    self._deferred -= 1
+                self._condition.notify_all()
+
+        if metrics.enabled:
+            metrics.observe('skyscope_upstream_wait_seconds', self.clock() - start, priority=PRIORITY_NAMES[priority])
+
+    def _forget(self, now):
+        while self._made and self._made[0] <= now - SECONDS_PER_DAY:
+            self._made.popleft()
+
+    def throttle(self, delay):
+        # The upstream answered 429: the budget is spent (possibly by other clients of the
+        # same key), so every caller pauses for `delay` seconds
+        with self._condition:
+            now = self.clock()
+            self.paused_until = max(self.paused_until, now + delay)
+            if self.minute is not None:
+                self.minute.refill(now)
+                self.minute.drain()
+            self.throttled += 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            now = self.clock()
+            stats = {
+                'queued': len(self._waiting),
+                'queued_deferred': self._deferred,
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+                'paused': max(0.0, self.paused_until - now),
+                'calls': dict(zip(PRIORITY_NAMES, self.calls)),
+            }
+            self._forget(now)
+            for name, limit, bucket, window in (('minute', self.per_minute, self.minute, 60.0),
+                                                ('day', self.per_day, self.day, SECONDS_PER_DAY)):
+                if bucket is None:
+                    continue
+                made = len(self._made) - bisect_right(self._made, now - window)
+                bucket.refill(now)
+                stats[f'limit_{name}'] = limit
+                stats[f'remaining_{name}'] = max(0, limit - made)
+                stats[f'available_{name}'] = int(max(0.0, bucket.tokens))  # Callable right now
+            return stats
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+_share = 1
+
+
+def share_quota(processes):
+    # Called in each of `processes` worker processes that use the same API key
+    global _share
+    with _schedulers_lock:
+        _share = max(1, processes)
+        _schedulers.clear()  # Schedulers made before this had the whole budget
+
+
+def scheduler_from_env(host, environ=os.environ):
+    # SKYSCOPE_CALLS_PER_MINUTE and SKYSCOPE_CALLS_PER_DAY set the budget of the API key,
+    # split evenly between the processes given to share_quota.
+    # Without them only the OpenWeatherMap API is limited; local stubs are not.
+    per_minute = environ.get('SKYSCOPE_CALLS_PER_MINUTE')
+    per_day = environ.get('SKYSCOPE_CALLS_PER_DAY')
+    if per_minute is None and per_day is None and host != OPENWEATHERMAP_HOST:
+        return None
+
+    per_minute = int(per_minute) if per_minute is not None else DEFAULT_PER_MINUTE
+    per_day = int(per_day) if per_day is not None else DEFAULT_PER_DAY
+    return UpstreamScheduler(
+        per_minute=max(1, per_minute // _share) if per_minute else None,
+        per_day=max(1, per_day // _share) if per_day else None
+    )
+
+
+def shared_scheduler(url):
+    # The quota belongs to the API key, so all calls to one host share a scheduler
+    host = urlparse(url).netloc
+    with _schedulers_lock:
+        if host not in _schedulers:
+            _schedulers[host] = scheduler_from_env(host)
+        return _schedulers[host]
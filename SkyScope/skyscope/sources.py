@@ -0,0 +1,155 @@
+import json
+import os
+import time
+
+from skyscope.cache import normalize_location
+from skyscope.client import requests, shared_client
+from skyscope.forecast import FORECAST_STEP
+from skyscope.locations import city_id
+from skyscope.metrics import metrics
+from skyscope.parse import parse_forecast
+from skyscope.scheduler import QuotaError, shared_scheduler
+
+FORECAST_URL = 'http://api.openweathermap.org/data/2.5/forecast'
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FetchError(Exception):
+    pass
+
+
+class HTTPSource:
+    # The OpenWeatherMap /forecast endpoint, or a local stub serving the same API. Every script
+    # uses it by default; a ReplaySource or local stub makes runs reproducible.
+
+    def __init__(self, url=None, api_key=None, client=None, scheduler=None):
+        self.url = url or os.environ.get('SKYSCOPE_UPSTREAM_URL', FORECAST_URL)
+        self.api_key = api_key or os.environ.get('OPENWEATHERMAP_API_KEY', 'API Key')
+        self.client = client or shared_client()
+        # None looks up the process-wide scheduler for this host when the first call is made,
+        # so a source pickled to a worker process uses that process's budget
+        self._scheduler = scheduler
+
+    @property
+    def scheduler(self):
+        return self._scheduler if self._scheduler is not None else shared_scheduler(self.url)
+
+    def fetch(self, location, units='metric'):
+        # A resolved location is asked for by city ID; only new spellings are searched by name
+        resolved = city_id(location)
+        params = {'id': resolved} if resolved is not None else {'q': location}
+        params.update(appid=self.api_key, units=units)
+        try:
+            # Up to the response headers; the body is read while it is parsed
+            with metrics.timer('skyscope_stage_seconds', stage='upstream'):
+                response = self.client.get(self.url, params, stream=True, scheduler=self.scheduler)
+        except (requests.RequestException, QuotaError) as error:
+            raise FetchError(str(error)) from error
+
+        try:
+            if response.status_code != 200:
+                raise FetchError(f"Status Code: {response.status_code}")
+            # Only the fields SkyScope reads are kept, as arrays, and never the whole decoded payload
+            with metrics.timer('skyscope_stage_seconds', stage='decode'):
+                return parse_forecast(response.iter_content(CHUNK_SIZE))
+        except requests.RequestException as error:
+            raise FetchError(str(error)) from error
+        except (ValueError, KeyError, TypeError, IndexError) as error:
+            # A 200 response whose body is not a forecast, e.g. a proxy's HTML error page
+            raise FetchError(f"Invalid forecast response: {error!r}") from error
+        finally:
+            response.close()
+
+
+def location_slug(location):
+    # File-name-safe form of a location, e.g. 'new york,us' -> 'new-york_us', 'id:2643743' -> 'id-2643743'
+    return normalize_location(location).replace(',', '_').replace(' ', '-').replace('/', '-').replace(':', '-')
+
+
+def fixture_name(location):
+    return location_slug(location) + '.json'
+
+
+def rebase(data, now=None, step=FORECAST_STEP):
+    # Shift recorded timestamps so the first entry falls in the current forecast step
+    if not data.get('list'):
+        return data
+    now = time.time() if now is None else now
+    offset = int(now) // step * step - data['list'][0]['dt']
+    return dict(data, list=[dict(item, dt=item['dt'] + offset) for item in data['list']])
+
+
+class ReplaySource:
+    # Serves recorded /forecast responses from `directory`, one <location>.json file each
+
+    def __init__(self, directory, default=None, shift=True):
+        self.directory = directory
+        self.default = default  # Fixture served for locations that were never recorded
+        self.shift = shift
+        self._loaded = {}
+        self._by_city = None  # City ID -> fixture name, read on the first query by ID
+
+    def load(self, name):
+        if name not in self._loaded:
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path):
+                return None
+            with open(path, encoding='utf-8') as fixture:
+                self._loaded[name] = json.load(fixture)
+        return self._loaded[name]
+
+    def find_city(self, resolved):
+        if self._by_city is None:
+            self._by_city = {}
+            for name in sorted(os.listdir(self.directory)):
+                data = self.load(name) if name.endswith('.json') else None
+                if data and 'city' in data:
+                    self._by_city.setdefault(data['city']['id'], name)
+        name = self._by_city.get(resolved)
+        return self.load(name) if name is not None else None
+
+    def fetch(self, location, units='metric'):
+        data = self.load(fixture_name(location))
+        resolved = city_id(location)
+        if data is None and resolved is not None:
+            data = self.find_city(resolved)
+        if data is None and self.default:
+            data = self.load(self.default)
+        if data is None:
+            raise FetchError(f"No recorded forecast for {location}")
+        return rebase(data) if self.shift else data
+
+
+class SyntheticSource:
+    # Generates forecasts of any size without the network, e.g. count=4000 for stress runs
+
+    def __init__(self, count=40):
+        self.count = count
+        self._names = {}  # City ID -> location it was generated for
+
+    def fetch(self, location, units='metric'):
+        from skyscope.stub import forecast_payload
+        resolved = city_id(location)
+        if resolved is not None:
+            if resolved not in self._names:
+                raise FetchError(f"Unknown city ID {resolved}")
+            location = self._names[resolved]
+        data = forecast_payload(location, self.count)
+        self._names[data['city']['id']] = location
+        return data
+
+
+class RecordingSource:
+    # Wraps another source and saves every response it returns as a replay fixture
+
+    def __init__(self, source, directory):
+        self.source = source
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def fetch(self, location, units='metric'):
+        data = self.source.fetch(location, units)
+        with open(os.path.join(self.directory, fixture_name(location)), 'w', encoding='utf-8') as fixture:
+            json.dump(dict(data), fixture)  # ForecastArrays from HTTPSource are mappings, not dicts
+        return data
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import threading
+import time
+
+from skyscope.columns import ForecastColumns
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    location TEXT NOT NULL,
+    units TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    city TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fetches_by_location ON fetches (location, units, fetched_at);
+
+-- Clustered on (location, units, dt): months of one city's forecasts are one contiguous range
+CREATE TABLE IF NOT EXISTS forecasts (
+    location TEXT NOT NULL,
+    units TEXT NOT NULL,
+    dt INTEGER NOT NULL,
+    fetch_id INTEGER NOT NULL,
+    temp REAL NOT NULL,
+    humidity REAL NOT NULL,
+    pressure REAL NOT NULL,
+    wind_speed REAL NOT NULL,
+    wind_deg REAL NOT NULL,
+    pop REAL NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (location, units, dt, fetch_id)
+) WITHOUT ROWID;
+
+-- What users typed, mapped to the canonical location its forecasts are stored under
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT PRIMARY KEY,
+    location TEXT NOT NULL
+) WITHOUT ROWID;
+'''
+
+_COLUMNS = 'dt, temp, humidity, pressure, wind_speed, wind_deg, pop, description'
+
+
+class ForecastStore:
+    # Append-only SQLite history of every forecast fetched, keyed like ForecastCache by
+    # (normalized location, units). Safe to share between threads and worker processes.
+
+    def __init__(self, path='skyscope.db', timeout=10.0, clock=time.time):
+        self.path = path
+        self.timeout = timeout
+        self.clock = clock
+        self.appends = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        with self._connection() as db:
+            db.executescript(_SCHEMA)
+
+    def _connection(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=self.timeout)
+            # Readers never block the one writer, and a crash loses at most the last append
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def append(self, key, data, fetched_at=None, aliases=()):
+        # `aliases` are other spellings of the location that latest() should find it under
+        location, units = key
+        fetched_at = int(self.clock() if fetched_at is None else fetched_at)
+        rows = [
+            (
+                item['dt'], item['main']['temp'], item['main']['humidity'], item['main']['pressure'],
+                item['wind']['speed'], item['wind']['deg'], item.get('pop', 0), item['weather'][0]['description'],
+            )
+            for item in data['list']
+        ]
+        with self._connection() as db:
+            fetch_id = db.execute(
+                'INSERT INTO fetches (location, units, fetched_at, city) VALUES (?, ?, ?, ?)',
+                (location, units, fetched_at, json.dumps(data['city']))
+            ).lastrowid
+            db.executemany(
+                f'INSERT OR IGNORE INTO forecasts (location, units, fetch_id, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(location, units, fetch_id, *row) for row in rows]
+            )
+            db.executemany(
+                'INSERT OR REPLACE INTO aliases (alias, location) VALUES (?, ?)',
+                [(alias, location) for alias in aliases if alias != location]
+            )
+        with self._stats_lock:
+            self.appends += 1
+
+    def resolve(self, location):
+        # The location forecasts typed as `location` were stored under
+        row = self._connection().execute('SELECT location FROM aliases WHERE alias = ?', (location,)).fetchone()
+        return row[0] if row is not None else location
+
+    def latest(self, key, since=None):
+        # The most recent stored forecast in /forecast payload form, or None when there is
+        # none fetched at or after `since`. Found by any alias, so it survives a restart
+        # that loses the in-memory LocationResolver.
+        location, units = key
+        location = self.resolve(location)
+        db = self._connection()
+        fetch = db.execute(
+            'SELECT id, fetched_at, city FROM fetches WHERE location = ? AND units = ? AND fetched_at >= ? '
+            'ORDER BY fetched_at DESC, id DESC LIMIT 1',
+            (location, units, since or 0)
+        ).fetchone()
+        if fetch is None:
+            return None
+
+        fetch_id, fetched_at, city = fetch
+        rows = db.execute(
+            f'SELECT {_COLUMNS} FROM forecasts WHERE location = ? AND units = ? AND fetch_id = ? ORDER BY dt',
+            (location, units, fetch_id)
+        ).fetchall()
+        return {
+            'city': json.loads(city),
+            'fetched_at': fetched_at,
+            'list': [
+                {
+                    'dt': dt,
+                    'main': {'temp': temp, 'humidity': humidity, 'pressure': pressure},
+                    'weather': [{'description': description}],
+                    'wind': {'speed': wind_speed, 'deg': wind_deg},
+                    'pop': pop,
+                }
+                for dt, temp, humidity, pressure, wind_speed, wind_deg, pop, description in rows
+            ],
+        }
+
+    def series(self, key, start, end):
+        # The most recently issued forecast for every timestamp in [start, end)
+        location, units = key
+        rows = self._connection().execute(
+            f'SELECT {_COLUMNS}, MAX(fetch_id) FROM forecasts '
+            'WHERE location = ? AND units = ? AND dt >= ? AND dt < ? GROUP BY dt ORDER BY dt',
+            (location, units, start, end)
+        ).fetchall()
+        return ForecastColumns.from_rows(rows)
+
+    def history(self, key, start, end):
+        # Every stored forecast for [start, end), as (fetched_at, ForecastColumns) oldest first,
+        # so successive forecasts for the same hours can be compared
+        location, units = key
+        rows = self._connection().execute(
+            f'SELECT r.fetch_id, f.fetched_at, {", ".join("r." + name for name in _COLUMNS.split(", "))} '
+            'FROM forecasts r JOIN fetches f ON f.id = r.fetch_id '
+            'WHERE r.location = ? AND r.units = ? AND r.dt >= ? AND r.dt < ? ORDER BY r.fetch_id, r.dt',
+            (location, units, start, end)
+        ).fetchall()
+
+        revisions = []
+        for fetch_id, fetched_at, *row in rows:
+            if not revisions or revisions[-1][0] != fetch_id:
+                revisions.append((fetch_id, fetched_at, []))
+            revisions[-1][2].append(row)
+        return [(fetched_at, ForecastColumns.from_rows(group)) for _, fetched_at, group in revisions]
+
+    def locations(self):
+        return self._connection().execute('SELECT DISTINCT location, units FROM fetches ORDER BY location').fetchall()
+
+    def stats(self):
+        db = self._connection()
+        with self._stats_lock:
+            appends = self.appends
+        return {
+            'backend': 'sqlite',
+            'appends': appends,
+            'fetches': db.execute('SELECT COUNT(*) FROM fetches').fetchone()[0],
+        }
+
+    def close(self):
+        db = getattr(self._local, 'db', None)
+        if db is not None:
+            db.close()
+            self._local.db = None
@@ -0,0 +1,284 @@
+import json
+import socketserver
+import threading
+import time
+import zlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = ['clear sky', 'few clouds', 'scattered clouds', 'broken clouds',
+              'light rain', 'moderate rain', 'thunderstorm', 'snow', 'mist']
+
+
+def forecast_payload(location='London', count=40, start=None, step=3 * 60 * 60):
+    # A synthetic /forecast response shaped like OpenWeatherMap's
+    if start is None:
+        start = int(time.time()) // step * step
+    name = location.split(',')[0].strip().title() or 'Unknown'
+    seed = sum(ord(char) for char in name)
+
+    items = []
+    for i in range(count):
+        temp = round(10 + (seed % 15) + 5 * ((i % 8) - 4) / 4, 2)
+        pressure = 1000 + (seed + i) % 30
+        description = CONDITIONS[(seed + i // 3) % len(CONDITIONS)]
+        # Every field OpenWeatherMap sends, including the ones SkyScope never reads
+        items.append({
+            'dt': start + i * step,
+            'main': {
+                'temp': temp,
+                'feels_like': round(temp - 1.5, 2),
+                'temp_min': round(temp - 0.8, 2),
+                'temp_max': round(temp + 0.8, 2),
+                'pressure': pressure,
+                'sea_level': pressure,
+                'grnd_level': pressure - 8,
+                'humidity': 40 + (seed + i * 7) % 50,
+                'temp_kf': 0.4,
+            },
+            'weather': [{'id': 800 + CONDITIONS.index(description), 'main': description.split()[-1].title(),
+                         'description': description, 'icon': '01d'}],
+            'clouds': {'all': (seed + i * 11) % 100},
+            'wind': {'speed': round(1 + (seed + i) % 12 * 0.75, 2), 'deg': (seed * 7 + i * 15) % 360,
+                     'gust': round(2 + (seed + i) % 12, 2)},
+            'visibility': 10000,
+            'pop': round(((seed + i * 3) % 10) / 10, 2),
+            'sys': {'pod': 'd' if 6 <= time.gmtime(start + i * step).tm_hour < 18 else 'n'},
+            'dt_txt': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(start + i * step)),
+        })
+
+    return {
+        'cod': '200',
+        'message': 0,
+        'cnt': count,
+        'list': items,
+        'city': {
+            # Distinct per name, unlike `seed`, since LocationResolver keys cities by ID
+            'id': 1000 + zlib.crc32(name.encode()) % 1000000,
+            'name': name,
+            'country': 'GB',
+            'coord': {'lat': 51.5, 'lon': -0.1},
+            'population': 100000 + seed * 10,
+            'timezone': 0,
+            'sunrise': start + 6 * 60 * 60,
+            'sunset': start + 18 * 60 * 60,
+        },
+    }
+
+
+class StubUpstream:
+    # Local stand-in for the /forecast endpoint with injectable delays and errors
+
+    def __init__(self, host='127.0.0.1', port=0, delay=0, count=40, source=None, limit=None, window=60.0):
+        self.delay = delay
+        self.count = count
+        self.source = source  # e.g. a ReplaySource, instead of synthetic forecasts
+        self.limit = limit  # Answer 429 beyond `limit` requests in any `window` seconds, like a quota
+        self.window = window
+        self.requests = 0
+        self.limited = 0
+        self._recent = deque()
+        self.connections = set()
+        self._names = {}  # City ID -> location, for queries by `id`
+        self._failures = []
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/data/2.5/forecast'
+
+    def fail_next(self, status, times=1, retry_after=None):
+        with self._lock:
+            self._failures.extend([(status, retry_after)] * times)
+
+    def respond(self, params):
+        # Returns (status, headers, body) for one request
+        with self._lock:
+            self.requests += 1
+            failure = self._failures.pop(0) if self._failures else None
+            if failure is None and self.limit is not None:
+                now = time.monotonic()
+                while self._recent and self._recent[0] <= now - self.window:
+                    self._recent.popleft()
+                if len(self._recent) >= self.limit:
+                    self.limited += 1
+                    failure = (429, int(self._recent[0] + self.window - now) + 1)
+                else:
+                    self._recent.append(now)
+
+        if self.delay:
+            time.sleep(self.delay)
+
+        if failure is not None:
+            status, retry_after = failure
+            headers = {'Retry-After': str(retry_after)} if retry_after is not None else {}
+            return status, headers, json.dumps({'cod': str(status), 'message': 'injected failure'}).encode()
+
+        not_found = 404, {}, json.dumps({'cod': '404', 'message': 'city not found'}).encode()
+        if 'id' in params:
+            city_id = params['id'][0]
+            with self._lock:
+                location = self._names.get(city_id)
+            if self.source is not None and location is None:
+                location = f'id:{city_id}'
+        else:
+            location = params.get('q', [''])[0]
+        if location is None or location.lower().startswith('nowhere'):
+            return not_found
+
+        if self.source is not None:
+            try:
+                data = self.source.fetch(location)
+            except Exception:
+                return not_found
+        else:
+            data = forecast_payload(location, self.count)
+        with self._lock:
+            self._names[str(data['city']['id'])] = location
+        return 200, {}, json.dumps(dict(data)).encode()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # Keep-alive, so connection reuse is observable
+            disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.connections.add(self.client_address)
+                status, headers, body = stub.respond(parse_qs(urlparse(self.path).query))
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client gave up waiting, e.g. after a read timeout
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class StubKeyValue:
+    # Local stand-in for a Redis server: GET, SET (PX/EX/NX), DEL, SELECT and PING
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.data = {}
+        self.commands = 0
+        self._lock = threading.Lock()
+        self.server = socketserver.ThreadingTCPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'redis://{host}:{port}/0'
+
+    def execute(self, args):
+        command = args[0].upper()
+        now = time.monotonic()
+        with self._lock:
+            self.commands += 1
+            for key in [key for key, (_, expires_at) in self.data.items() if expires_at is not None and expires_at <= now]:
+                del self.data[key]
+
+            if command in (b'PING', b'SELECT'):
+                return b'+OK\r\n' if command == b'SELECT' else b'+PONG\r\n'
+            if command == b'GET':
+                entry = self.data.get(args[1])
+                if entry is None:
+                    return b'$-1\r\n'
+                return b'$%d\r\n%s\r\n' % (len(entry[0]), entry[0])
+            if command == b'SET':
+                key, value, options = args[1], args[2], [arg.upper() for arg in args[3:]]
+                if b'NX' in options and key in self.data:
+                    return b'$-1\r\n'
+                expires_at = None
+                if b'PX' in options:
+                    expires_at = now + int(options[options.index(b'PX') + 1]) / 1000
+                elif b'EX' in options:
+                    expires_at = now + int(options[options.index(b'EX') + 1])
+                self.data[key] = (value, expires_at)
+                return b'+OK\r\n'
+            if command == b'DEL':
+                removed = sum(1 for key in args[1:] if self.data.pop(key, None) is not None)
+                return b':%d\r\n' % removed
+        return b'-ERR unknown command\r\n'
+
+    def _handler(self):
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                while True:
+                    line = self.rfile.readline()
+                    if not line.startswith(b'*'):
+                        return
+                    args = []
+                    for _ in range(int(line[1:-2])):
+                        length = int(self.rfile.readline()[1:-2])
+                        args.append(self.rfile.read(length + 2)[:-2])
+                    self.wfile.write(stub.execute(args))
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve synthetic forecasts locally.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0)
+    parser.add_argument('--count', type=int, default=40)
+    parser.add_argument('--fixtures', help='Directory of recorded /forecast responses to replay')
+    args = parser.parse_args()
+
+    source = None
+    if args.fixtures:
+        from skyscope.sources import ReplaySource
+        source = ReplaySource(args.fixtures)
+
+    stub = StubUpstream(port=args.port, delay=args.delay, count=args.count, source=source)
+    print(f"Serving synthetic forecasts at {stub.url}")
+    stub.server.serve_forever()
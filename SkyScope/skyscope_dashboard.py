@@ -1,117 +1,318 @@
-import requests
-from datetime import datetime, timedelta
-import plotly.graph_objects as go
-import numpy as np
-import dash
-from dash import dcc, html
-import dash_bootstrap_components as dbc
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from skyscope.lazy import lazy_import
+from skyscope.cache import ForecastCache, forecast_key
+from skyscope.columns import ForecastColumns, daily_aggregate, first_per_day, series, stack_locations
+from skyscope.figures import forecast_hash, grid_hash, slim_template
+from skyscope.locations import LocationResolver
+from skyscope.metrics import metrics
+from skyscope.refresher import FORECAST_STEP, ForecastRefresher
+from skyscope.singleflight import SingleFlight
+from skyscope.sources import FetchError, HTTPSource
+
+# Dash, Plotly and NumPy load when the dashboard is built, not when this module is imported
+go = lazy_import('plotly.graph_objects')
+subplots = lazy_import('plotly.subplots')
+np = lazy_import('numpy')
+dash = lazy_import('dash')
+dbc = lazy_import('dash_bootstrap_components')
+flask = lazy_import('flask')
+
+# Chart names for instrumentation, in the order of graph_ids()
+CHARTS = [
+    ('bar', 'plot_bar_chart'),
+    ('pie', 'plot_pie_chart'),
+    ('gauge', 'plot_gauge_chart'),
+    ('box', 'plot_box_plot'),
+    ('heatmap', 'plot_heatmap'),
+    ('polar', 'plot_wind_polar'),
+    ('pressure', 'plot_pressure_line'),
+    ('combined', 'plot_combined_chart')
+]
+
+# Graphs of the multi-location comparison view
+COMPARISON_GRAPH_IDS = ['compare-heatmap', 'compare-box', 'compare-line']
+
+# Most locations one comparison fetches; the rest of the list is ignored
+MAX_COMPARE = 100
+
+# Longest day range the browser can pick; the upstream forecast covers five days
+MAX_DAYS = 5
+
+# Graphs whose trace count and names change with the location; these are always sent whole
+UNPATCHED_GRAPH_IDS = {'history-chart'}
+
+# Trace properties that carry forecast data and change from one location to the next
+PATCHED_TRACE_KEYS = ('x', 'y', 'z', 'r', 'theta', 'width', 'base', 'labels', 'values', 'value')
 
 class Skylitics:
 
-    def __init__(self):
+    def __init__(self, mode='daily', days=3, compact=False, cache=None, source=None, store=None, locations=None,
+                 clientside=False):
         self.location = None
-        self.api_key = 'API Key'
-        self.url = 'http://api.openweathermap.org/data/2.5/forecast'
-        self.params = {
-            'appid': self.api_key,
-            'units': 'metric'
-        }
+        self.units = 'metric'
+        self.source = source or HTTPSource()
+        self.mode = mode  # 'daily' keeps the first forecast of each day, 'series' every 3-hourly entry
+        self.days = days
+        self.label_format = '%a %d %b %H:%M' if mode == 'series' else '%A, %d %B %Y'
+        self.compact = compact  # Render all charts as one subplot figure with a slim shared template
+        # Send the forecast arrays once and build the charts in the browser (assets/skyscope_clientside.js)
+        self.clientside = clientside
+        # Pass a RedisForecastCache to share forecasts between worker processes
+        self.cache = cache if cache is not None else ForecastCache(maxsize=256, ttl=2 * FORECAST_STEP)
+        # A ForecastStore keeps every fetched forecast on disk for restarts and history
+        self.store = store
+        # Maps typed locations to the city the upstream returned, for cache keys and suggestions
+        self.locations = locations if locations is not None else LocationResolver()
+        self.refresher = ForecastRefresher(self.fetch_forecast, cache=self.cache)
+        self.figure_cache = ForecastCache(maxsize=128, ttl=None)
+        self.flights = SingleFlight()
+        self.executor = ThreadPoolExecutor(max_workers=16)  # Concurrent fetches for comparisons
         self.app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
     
-    def weather_data(self):
-        if self.location:
-            self.params['q'] = self.location
-
-        response = requests.get(self.url, self.params)
-        if response.status_code == 200:
-            data = response.json()
-        else:
-            print(f"Failed to fetch weather data. Status Code: {response.status_code}")
+    def fetch_forecast(self, key):
+        location, units = key
+        if self.store is not None:
+            # After a restart, a forecast stored during the current step is still current
+            data = self.store.latest(key, since=time.time() // FORECAST_STEP * FORECAST_STEP)
+            if data is not None:
+                return data
+
+        try:
+            data = self.source.fetch(location, units)
+        except FetchError as error:
+            print(f"Failed to fetch weather data. {error}")
             return None
 
+        if data and self.store is not None:
+            canonical = forecast_key(self.locations.learn(location, data['city']), units)
+            # Recorded under the typed spelling too, so a restart can find it without the resolver
+            self.store.append(canonical, data, aliases=[location])
+        return data
+
+    def location_key(self, location):
+        # "london", "London" and "London,GB" share one key once the upstream has resolved any of them
+        return forecast_key(self.locations.resolve(location), self.units)
+
+    def weather_data(self, location=None):
+        # The location is passed per request; concurrent callbacks must not share it
+        location = location or self.location
+
+        columns = self.forecast_columns(location)
+        if columns is None:
+            return None
+        with metrics.timer('skyscope_stage_seconds', stage='filter'):
+            return self.select(columns)
+
+    def forecast_columns(self, location):
+        # Concurrent lookups for the same location share one upstream call and its parsed result
+        key = self.location_key(location)
+        return self.flights.do(key, lambda: self.load_forecast(key))
+
+    def load_forecast(self, key):
+        # Serve the cached copy, even a stale one, and let the refresher update it
+        data = self.refresher.get(key)
+        if data is None:
+            # On a miss only one worker goes upstream; the others wait for its result
+            data = self.cache.get_or_set(key, lambda: self.fetch_forecast(key))
+            if data:
+                canonical = forecast_key(self.locations.learn(key[0], data['city']), key[1])
+                if canonical != key:
+                    # First sight of this spelling; later lookups resolve to the canonical entry
+                    self.cache.set(canonical, data)
+                self.refresher.track(canonical)
+
         if not data:
             print("No weather data available.")
             return None
 
-        current_date = datetime.utcnow().date()
-        forecast_days = [current_date, current_date + timedelta(days=1), current_date + timedelta(days=2)]
-
-        daily_forecasts = {}
-        for item in data['list']:
-            forecast_time = datetime.utcfromtimestamp(item['dt'])
-            forecast_date = forecast_time.date()
-
-            if forecast_date in forecast_days and forecast_date not in daily_forecasts:
-                daily_forecasts[forecast_date] = item
-
-        return daily_forecasts
-
-    def create_plots(self, daily_forecasts):
-        dates = []
-        temps = []
-        humidities = []
-        pressures = []
-        directions = []
-        speeds = []
-        precip_probs = []
-        weather_conditions = {}
-
-        for forecast_date, forecast in daily_forecasts.items():
-            dates.append(forecast_date.strftime('%A, %d %B %Y'))
-            temps.append(forecast['main']['temp'])
-            humidities.append(forecast['main']['humidity'])
-            pressures.append(forecast['main']['pressure'])
-            directions.append(forecast['wind']['deg'])
-            speeds.append(forecast['wind']['speed'])
-            precip_probs.append(forecast.get('pop', 0) * 100)
-            condition = forecast['weather'][0]['description']
-            weather_conditions[condition] = weather_conditions.get(condition, 0) + 1
-
-        # Bar Chart
+        with metrics.timer('skyscope_stage_seconds', stage='parse'):
+            return ForecastColumns.from_payload(data)
+
+    def select(self, columns):
+        if self.mode == 'series':
+            return series(columns, self.days)
+        return first_per_day(columns, self.days)
+
+    def parse_locations(self, text):
+        # Several locations are separated by semicolons or new lines; commas belong to "City,CC"
+        locations = []
+        for location in re.split(r'[;\n]', text):
+            location = location.strip()
+            if location and location not in locations:
+                locations.append(location)
+        return locations[:MAX_COMPARE]
+
+    def comparison_data(self, locations):
+        # Every location is fetched concurrently through the same caches as single lookups,
+        # then stacked into location x time arrays
+        names, columns, missing = [], [], []
+        for location, forecast in zip(locations, self.executor.map(self.forecast_columns, locations)):
+            selected = series(forecast, self.days) if forecast is not None else None
+            if selected is None or not len(selected):
+                missing.append(location)
+                continue
+            city = self.locations.city(location)
+            names.append(f"{city.name}, {city.country}" if city is not None else location)
+            columns.append(selected)
+        return stack_locations(names, columns), missing
+
+    def create_comparison_plots(self, grid):
+        key = grid_hash(grid, self.days)
+        figures = self.figure_cache.get(key)
+        if figures is None:
+            plots = (self.plot_comparison_heatmap(grid), self.plot_comparison_box(grid), self.plot_comparison_line(grid))
+            figures = tuple(fig.to_plotly_json() for fig in plots)
+            self.figure_cache.set(key, figures)
+        return key, figures
+
+    # Heatmap of temperature, one row per location
+    def plot_comparison_heatmap(self, grid):
+        heatmap = go.Figure(data=go.Heatmap(
+            z=grid.temp,
+            x=grid.dt.astype('datetime64[s]'),
+            y=grid.locations,
+            colorscale='Viridis',
+            colorbar=dict(title="°C")
+        ))
+        heatmap.update_layout(
+            title=f"Temperature by Location for the Next {self.days} Days",
+            height=max(450, 22 * len(grid.locations)),
+            template="plotly_dark"
+        )
+        return heatmap
+
+    # Box Plot of temperature per location, as one trace
+    def plot_comparison_box(self, grid):
+        values = grid.temp.ravel()
+        valid = ~np.isnan(values)
+        box_plot = go.Figure(data=[go.Box(
+            x=np.repeat(grid.locations, grid.temp.shape[1])[valid],
+            y=values[valid],
+            boxmean=True
+        )])
+        box_plot.update_layout(
+            title=f"Temperature Variability by Location for the Next {self.days} Days",
+            yaxis_title="Temperature (°C)",
+            template="plotly_dark"
+        )
+        return box_plot
+
+    # Line Chart of temperature, one line per location
+    def plot_comparison_line(self, grid):
+        times = grid.dt.astype('datetime64[s]')
+        line_chart = go.Figure(data=[
+            go.Scattergl(x=times, y=row, mode='lines', name=name)
+            for name, row in zip(grid.locations, grid.temp)
+        ])
+        line_chart.update_layout(
+            title=f"Temperature Forecast by Location for the Next {self.days} Days",
+            xaxis_title="Date",
+            yaxis_title="Temperature (°C)",
+            template="plotly_dark"
+        )
+        return line_chart
+
+    def charts(self):
+        charts = list(CHARTS)
+        if self.mode == 'series' and not self.compact:
+            # The 3-hourly series is also summarized per day
+            charts.append(('summary', 'plot_daily_summary'))
+        if self.store is not None and not self.compact:
+            charts.append(('history', 'plot_forecast_history'))
+        return charts
+
+    def figure_key(self, daily_forecasts, key=None):
+        # The history chart differs per location even when two forecasts are identical
+        location = key if self.store is not None else None
+        return forecast_hash(daily_forecasts, self.mode, self.days, self.compact, self.label_format, location)
+
+    def create_plots(self, daily_forecasts, key=None):
+        # Repeat views of the same forecast reuse the serialized figures and skip validation
+        figure_key = self.figure_key(daily_forecasts, key)
+        figures = self.figure_cache.get(figure_key)
+        if figures is None:
+            plots = self.build_plots(daily_forecasts, key)
+            with metrics.timer('skyscope_stage_seconds', stage='to_plotly_json'):
+                figures = tuple(fig.to_plotly_json() for fig in plots)
+            self.figure_cache.set(figure_key, figures)
+        return figures
+
+    def build_plots(self, daily_forecasts, key=None):
+        if self.compact:
+            with metrics.timer('skyscope_chart_seconds', chart='compact'):
+                return (self.create_compact_plot(daily_forecasts),)
+
+        charts = []
+        for name, plot in self.charts():
+            with metrics.timer('skyscope_chart_seconds', chart=name):
+                if name == 'history':
+                    charts.append(self.plot_forecast_history(daily_forecasts, key))
+                else:
+                    charts.append(getattr(self, plot)(daily_forecasts))
+        return tuple(charts)
+
+    # Bar Chart
+    def plot_bar_chart(self, daily_forecasts):
+        dates = daily_forecasts.labels(self.label_format)
         bar_chart = go.Figure(data=[
-            go.Bar(name='Temperature (°C)', x=dates, y=temps, marker_color='blue'),
-            go.Bar(name='Humidity (%)', x=dates, y=humidities, marker_color='orange')
+            go.Bar(name='Temperature (°C)', x=dates, y=daily_forecasts.temp, marker_color='blue'),
+            go.Bar(name='Humidity (%)', x=dates, y=daily_forecasts.humidity, marker_color='orange')
         ])
         bar_chart.update_layout(
-            title="Temperature and Humidity for the Next 3 Days",
+            title=f"Temperature and Humidity for the Next {self.days} Days",
             barmode='group',
             xaxis_title="Date",
             yaxis_title="Value",
             template="plotly_dark"
         )
+        return bar_chart
 
-        # Pie Chart
+    # Pie Chart
+    def plot_pie_chart(self, daily_forecasts):
+        weather_conditions = daily_forecasts.condition_counts()
         pie_chart = go.Figure(data=[go.Pie(labels=list(weather_conditions.keys()), values=list(weather_conditions.values()))])
-        pie_chart.update_layout(title="Weather Condition Distribution for the Next 3 Days")
+        pie_chart.update_layout(title=f"Weather Condition Distribution for the Next {self.days} Days")
+        return pie_chart
 
-        # Gauge Chart
-        current_humidity = daily_forecasts[list(daily_forecasts.keys())[0]]['main']['humidity']
+    # Gauge Chart
+    def plot_gauge_chart(self, daily_forecasts):
+        current_humidity = float(daily_forecasts.humidity[0])
         gauge_chart = go.Figure(go.Indicator(
             mode="gauge+number",
             value=current_humidity,
             title={'text': "Current Humidity (%)"},
             gauge={'axis': {'range': [0, 100]}, 'bar': {'color': "blue"}}
         ))
+        return gauge_chart
 
-        # Box Plot
-        box_plot = go.Figure(data=[go.Box(y=temps, boxmean=True)])
-        box_plot.update_layout(title="Temperature Variability for the Next 3 Days", yaxis_title="Temperature (°C)")
+    # Box Plot
+    def plot_box_plot(self, daily_forecasts):
+        box_plot = go.Figure(data=[go.Box(y=daily_forecasts.temp, boxmean=True)])
+        box_plot.update_layout(title=f"Temperature Variability for the Next {self.days} Days", yaxis_title="Temperature (°C)")
+        return box_plot
 
-        # Heatmap
-        heatmap_data = np.array([temps, humidities])
+    # Heatmap
+    def plot_heatmap(self, daily_forecasts):
+        heatmap_data = np.vstack([daily_forecasts.temp, daily_forecasts.humidity])
         heatmap = go.Figure(data=go.Heatmap(
             z=heatmap_data,
-            x=dates,
+            x=daily_forecasts.labels(self.label_format),
             y=["Temperature (°C)", "Humidity (%)"],
             colorscale='Viridis'
         ))
-        heatmap.update_layout(title="Temperature and Humidity Heatmap for the Next 3 Days")
+        heatmap.update_layout(title=f"Temperature and Humidity Heatmap for the Next {self.days} Days")
+        return heatmap
 
-        # Polar Bar Chart for Wind Speed and Direction
+    # Polar Bar Chart for Wind Speed and Direction
+    def plot_wind_polar(self, daily_forecasts):
+        speeds = daily_forecasts.wind_speed
         polar_chart = go.Figure(
             data=go.Barpolar(
                 r=speeds,
-                theta=directions,
+                theta=daily_forecasts.wind_deg,
                 width=[15] * len(speeds),
                 marker_color=speeds,
                 marker_colorscale='Blues',
@@ -125,30 +326,35 @@ class Skylitics:
                 radialaxis=dict(angle=45, gridcolor="gray")
             )
         )
-    
-        # Line Chart for Atmospheric Pressure
+        return polar_chart
+
+    # Line Chart for Atmospheric Pressure
+    def plot_pressure_line(self, daily_forecasts):
         pressure_chart = go.Figure(
             data=go.Scatter(
-                x=dates,
-                y=pressures,
+                x=daily_forecasts.labels(self.label_format),
+                y=daily_forecasts.pressure,
                 mode='lines+markers',
                 line=dict(color='purple')
             )
         )
         pressure_chart.update_layout(
-            title="Atmospheric Pressure Over the Next 3 Days",
+            title=f"Atmospheric Pressure Over the Next {self.days} Days",
             xaxis_title="Date",
             yaxis_title="Pressure (hPa)",
             template="plotly_dark"
         )
+        return pressure_chart
 
-        # Combined Chart for Precipitation and Temperature
+    # Combined Chart for Precipitation and Temperature
+    def plot_combined_chart(self, daily_forecasts):
+        dates = daily_forecasts.labels(self.label_format)
         combined_chart = go.Figure()
 
         # Add precipitation as a bar chart
         combined_chart.add_trace(go.Bar(
             x=dates,
-            y=precip_probs,
+            y=daily_forecasts.pop * 100,
             name="Precipitation Probability (%)",
             marker_color='blue',
             yaxis='y1'  # Use primary y-axis
@@ -157,7 +363,7 @@ class Skylitics:
         # Add temperature as a line chart
         combined_chart.add_trace(go.Scatter(
             x=dates,
-            y=temps,
+            y=daily_forecasts.temp,
             name="Temperature (°C)",
             mode='lines+markers',
             line=dict(color='orange'),
@@ -167,7 +373,7 @@ class Skylitics:
         # Update layout for dual y-axis and adjusted title/legend
         combined_chart.update_layout(
             title=dict(
-                text="Precipitation Probability and Temperature Over the Next 3 Days",
+                text=f"Precipitation Probability and Temperature Over the Next {self.days} Days",
                 x=0.5,  # Center the title
                 y=0.95,  # Position title slightly above
                 font=dict(size=20)
@@ -194,73 +400,418 @@ class Skylitics:
             )
         )
 
-        return bar_chart, pie_chart, gauge_chart, box_plot, heatmap, polar_chart, pressure_chart, combined_chart
+        return combined_chart
     
+    # Daily temperature range and mean with the expected number of rainy 3-hour periods
+    def plot_daily_summary(self, daily_forecasts):
+        aggregates = daily_aggregate(daily_forecasts, self.days)
+        dates = [str(date) for date in aggregates.date]
+        summary_chart = go.Figure()
+        summary_chart.add_trace(go.Bar(
+            x=dates,
+            y=aggregates.temp_max - aggregates.temp_min,
+            base=aggregates.temp_min,
+            name="Temperature Range (°C)",
+            marker_color='orange',
+            opacity=0.6
+        ))
+        summary_chart.add_trace(go.Scatter(
+            x=dates,
+            y=aggregates.temp_mean,
+            name="Mean Temperature (°C)",
+            mode='lines+markers',
+            line=dict(color='white')
+        ))
+        summary_chart.add_trace(go.Scatter(
+            x=dates,
+            y=aggregates.pop_sum,
+            name="Expected Rainy 3-Hour Periods",
+            mode='markers',
+            marker=dict(color='blue', size=12),
+            yaxis='y2'
+        ))
+        summary_chart.update_layout(
+            title=f"Daily Summary for the Next {self.days} Days",
+            xaxis_title="Date",
+            yaxis=dict(title="Temperature (°C)"),
+            yaxis2=dict(title="Rainy Periods", overlaying='y', side='right', rangemode='tozero'),
+            template="plotly_dark"
+        )
+        return summary_chart
+
+    # Line Chart comparing successive forecasts for the same hours, from the store
+    def plot_forecast_history(self, daily_forecasts, key):
+        history_chart = go.Figure()
+        if key is not None and len(daily_forecasts):
+            start = int(daily_forecasts.dt[0])
+            end = int(daily_forecasts.dt[-1]) + FORECAST_STEP
+            for fetched_at, forecast in self.store.history(key, start, end)[-8:]:
+                history_chart.add_trace(go.Scatter(
+                    x=forecast.times(),
+                    y=forecast.temp,
+                    mode='lines',
+                    name=datetime.utcfromtimestamp(fetched_at).strftime("Issued %d %b %H:%M")
+                ))
+        history_chart.update_layout(
+            title=f"Temperature Forecast Revisions for the Next {self.days} Days",
+            xaxis_title="Date",
+            yaxis_title="Temperature (°C)",
+            template="plotly_dark"
+        )
+        return history_chart
+
+    def create_compact_plot(self, daily_forecasts):
+        dates = daily_forecasts.labels(self.label_format)
+        temps = daily_forecasts.temp
+        humidities = daily_forecasts.humidity
+        speeds = daily_forecasts.wind_speed
+        weather_conditions = daily_forecasts.condition_counts()
+
+        fig = subplots.make_subplots(
+            rows=4, cols=2,
+            specs=[
+                [{'type': 'xy'}, {'type': 'domain'}],
+                [{'type': 'domain'}, {'type': 'xy'}],
+                [{'type': 'xy'}, {'type': 'polar'}],
+                [{'type': 'xy'}, {'type': 'xy', 'secondary_y': True}]
+            ],
+            subplot_titles=(
+                "Temperature and Humidity",
+                "Weather Condition Distribution",
+                "Current Humidity (%)",
+                "Temperature Variability",
+                "Temperature and Humidity Heatmap",
+                "Wind Speed and Direction",
+                "Atmospheric Pressure",
+                "Precipitation Probability and Temperature"
+            ),
+            vertical_spacing=0.08
+        )
+
+        fig.add_trace(go.Bar(name='Temperature (°C)', x=dates, y=temps, marker_color='blue'), row=1, col=1)
+        fig.add_trace(go.Bar(name='Humidity (%)', x=dates, y=humidities, marker_color='orange'), row=1, col=1)
+        fig.add_trace(go.Pie(labels=list(weather_conditions.keys()), values=list(weather_conditions.values())), row=1, col=2)
+        fig.add_trace(go.Indicator(
+            mode="gauge+number",
+            value=float(humidities[0]),
+            gauge={'axis': {'range': [0, 100]}, 'bar': {'color': "blue"}}
+        ), row=2, col=1)
+        fig.add_trace(go.Box(y=temps, boxmean=True, name="Temperature (°C)"), row=2, col=2)
+        fig.add_trace(go.Heatmap(
+            z=np.vstack([temps, humidities]),
+            x=dates,
+            y=["Temperature (°C)", "Humidity (%)"],
+            colorscale='Viridis',
+            showscale=False
+        ), row=3, col=1)
+        fig.add_trace(go.Barpolar(
+            r=speeds,
+            theta=daily_forecasts.wind_deg,
+            width=[15] * len(speeds),
+            marker_color=speeds,
+            marker_colorscale='Blues',
+            opacity=0.75
+        ), row=3, col=2)
+        fig.add_trace(go.Scatter(
+            x=dates, y=daily_forecasts.pressure, name="Pressure (hPa)", mode='lines+markers', line=dict(color='purple')
+        ), row=4, col=1)
+        fig.add_trace(go.Bar(
+            x=dates, y=daily_forecasts.pop * 100, name="Precipitation Probability (%)", marker_color='blue'
+        ), row=4, col=2)
+        fig.add_trace(go.Scatter(
+            x=dates, y=temps, name="Temperature (°C)", mode='lines+markers', line=dict(color='orange')
+        ), row=4, col=2, secondary_y=True)
+
+        fig.update_polars(
+            angularaxis=dict(direction="clockwise", showline=False),
+            radialaxis=dict(angle=45, gridcolor="gray")
+        )
+        fig.update_layout(
+            title=f"Weather Forecast for the Next {self.days} Days",
+            barmode='group',
+            height=1600,
+            template=slim_template()
+        )
+        return fig
+
+    def client_data(self, columns):
+        # Everything the clientside charts need, in metric units; the browser selects days and converts
+        return {
+            'mode': self.mode,
+            'dt': columns.dt.tolist(),
+            'labels': columns.labels(self.label_format),
+            'temp': columns.temp.tolist(),
+            'humidity': columns.humidity.tolist(),
+            'pressure': columns.pressure.tolist(),
+            'wind_speed': columns.wind_speed.tolist(),
+            'wind_deg': columns.wind_deg.tolist(),
+            'pop': columns.pop.tolist(),
+            'weather': columns.weather.tolist(),
+            'conditions': columns.conditions
+        }
+
+    def graph_ids(self):
+        if self.compact:
+            return ['dashboard-chart']
+        graph_ids = ['bar-chart', 'pie-chart', 'gauge-chart', 'box-plot', 'heatmap', 'polar-chart', 'line-chart', 'combined-chart']
+        if self.mode == 'series':
+            graph_ids.append('summary-chart')
+        if self.store is not None:
+            graph_ids.append('history-chart')
+        return graph_ids
+
+    def figure_patch(self, figure):
+        # Replace only the trace arrays and titles; layouts and templates stay in the browser
+        patch = dash.Patch()
+        for index, trace in enumerate(figure['data']):
+            for name in PATCHED_TRACE_KEYS:
+                if name in trace:
+                    patch['data'][index][name] = trace[name]
+            color = trace.get('marker', {}).get('color')
+            if color is not None and not isinstance(color, str):
+                patch['data'][index]['marker']['color'] = color
+
+        if 'title' in figure['layout']:
+            patch['layout']['title'] = figure['layout']['title']
+        return patch
+
     def app_layout(self):
+        from dash import dcc, html
         self.app.layout = html.Div([
             html.H1("Weather Forecast Dashboard", style={'textAlign': 'center'}),
-            dcc.Input(id='location-input', type='text', placeholder='Enter location', style={'textAlign': 'center', 'marginBottom': '20px'}),
+            dcc.Input(id='location-input', type='text', placeholder='Enter location, or several separated by ;', list='location-suggestions', style={'textAlign': 'center', 'marginBottom': '20px', 'width': '400px'}),
+            html.Datalist(id='location-suggestions'),
             html.Button(id='submit-button', n_clicks=0, children='Submit', style={'textAlign': 'center', 'marginBottom': '20px'}),
             html.Div(id='forecast-output', style={'textAlign': 'center', 'marginBottom': '20px'}),
-
-            dcc.Graph(id='bar-chart'),
-            dcc.Graph(id='pie-chart'),
-            dcc.Graph(id='gauge-chart'),
-            dcc.Graph(id='box-plot'),
-            dcc.Graph(id='heatmap'),
-            dcc.Graph(id='polar-chart'),
-            dcc.Graph(id='line-chart'),
-            dcc.Graph(id='combined-chart')
+            *(self.client_layout() if self.clientside else self.server_layout())
         ])
+
+    def server_layout(self):
+        from dash import dcc, html
+        return [
+            dcc.Store(id='forecast-key'),
+            html.Div(id='single-charts', children=[dcc.Graph(id=graph_id) for graph_id in self.graph_ids()]),
+            html.Div(id='comparison-charts', style={'display': 'none'},
+                     children=[dcc.Graph(id=graph_id) for graph_id in COMPARISON_GRAPH_IDS])
+        ]
+
+    def client_layout(self):
+        from dash import dcc, html
+        return [
+            html.Div([
+                dcc.RadioItems(id='units-toggle', value='metric', inline=True,
+                               options=[{'label': " Metric ", 'value': 'metric'}, {'label': " Imperial ", 'value': 'imperial'}]),
+                dcc.Slider(id='days-slider', min=1, max=MAX_DAYS, step=1, value=min(self.days, MAX_DAYS),
+                           marks={day: f"{day} days" if day > 1 else "1 day" for day in range(1, MAX_DAYS + 1)}),
+                dcc.Dropdown(id='chart-picker', multi=True, value=[name for name, _ in CHARTS],
+                             options=[{'label': name.capitalize(), 'value': name} for name, _ in CHARTS],
+                             style={'color': 'black'})
+            ], style={'width': '600px', 'margin': '0 auto 20px auto'}),
+            dcc.Store(id='forecast-data'),
+            # Sent once with the layout instead of with every figure
+            dcc.Store(id='chart-template', data=slim_template().to_plotly_json()),
+            html.Div(id='client-charts', children=[dcc.Graph(id=f'client-{name}') for name, _ in CHARTS])
+        ]
     
     def callback(self):
+        self.suggestion_callback()
+        if self.clientside:
+            self.client_callbacks()
+            return
+
         @self.app.callback(
             [
                 dash.dependencies.Output('forecast-output', 'children'),
-                dash.dependencies.Output('bar-chart', 'figure'),
-                dash.dependencies.Output('pie-chart', 'figure'),
-                dash.dependencies.Output('gauge-chart', 'figure'),
-                dash.dependencies.Output('box-plot', 'figure'),
-                dash.dependencies.Output('heatmap', 'figure'),
-                dash.dependencies.Output('polar-chart', 'figure'),
-                dash.dependencies.Output('line-chart', 'figure'),
-                dash.dependencies.Output('combined-chart', 'figure')
+                dash.dependencies.Output('forecast-key', 'data'),
+                dash.dependencies.Output('single-charts', 'style'),
+                dash.dependencies.Output('comparison-charts', 'style')
             ],
             [dash.dependencies.Input('submit-button', 'n_clicks')],
-            [dash.dependencies.State('location-input', 'value')]
+            [
+                dash.dependencies.State('location-input', 'value'),
+                dash.dependencies.State('forecast-key', 'data')
+            ]
         )
-        def update_dashboard(n_clicks, location):
-            if n_clicks == 0 or not location:
-                return "Please enter a location and click Submit.", {}, {}, {}, {}, {}, {}, {}, {}
+        @metrics.timed('skyscope_callback_seconds', callback='update_dashboard')
+        def update_dashboard(n_clicks, location, previous):
+            single, hidden = {}, {'display': 'none'}
+            # Blank or separator-only input such as " ; " holds no location
+            locations = self.parse_locations(location or '')
+            if n_clicks == 0 or not locations:
+                return "Please enter a location and click Submit.", None, single, hidden
 
-            # Set the location dynamically based on user input
-            self.location = location
-            self.params['q'] = self.location
+            if len(locations) > 1:
+                return self.update_comparison(locations)
 
-            # Fetch weather data
-            daily_forecasts = self.weather_data()
+            # Fetch weather data for the location entered by the user
+            location = locations[0]
+            daily_forecasts = self.weather_data(location)
             if not daily_forecasts:
-                return f"No data available for {location}. Please check the location and try again.", {}, {}, {}, {}, {}, {}, {}, {}
-
-            # Generate the plots
-            bar_chart, pie_chart, gauge_chart, box_plot, heatmap, polar_chart, line_chart, combined_chart = self.create_plots(daily_forecasts)
-
-            return (
-                f"Weather forecast for {location.capitalize()}:",
-                bar_chart,
-                pie_chart,
-                gauge_chart,
-                box_plot,
-                heatmap,
-                polar_chart,
-                line_chart,
-                combined_chart
+                return f"No data available for {location}. Please check the location and try again.", None, single, hidden
+
+            # Build the figures once here; each chart callback picks its own from the figure cache
+            key = self.location_key(location)
+            self.create_plots(daily_forecasts, key)
+
+            return f"Weather forecast for {location.capitalize()}:", {
+                'key': self.figure_key(daily_forecasts, key),
+                'location': location,
+                'compare': False,
+                # The graphs already hold full single-location figures to patch
+                'patch': bool(previous) and not previous.get('compare')
+            }, single, hidden
+
+        for index, graph_id in enumerate(self.graph_ids()):
+            self.chart_callback(index, graph_id)
+        for index, graph_id in enumerate(COMPARISON_GRAPH_IDS):
+            self.comparison_callback(index, graph_id)
+
+    def suggestion_callback(self):
+        @self.app.callback(
+            dash.dependencies.Output('location-suggestions', 'children'),
+            [dash.dependencies.Input('location-input', 'value')]
+        )
+        def suggest_locations(value):
+            # Served from the local index of cities already fetched; never goes upstream
+            from dash import html
+            if not value or ';' in value:
+                return []  # Picking a suggestion would replace the whole list
+            return [html.Option(value=name) for name in self.locations.suggest(value)]
+
+    def client_callbacks(self):
+        @self.app.callback(
+            [
+                dash.dependencies.Output('forecast-output', 'children'),
+                dash.dependencies.Output('forecast-data', 'data')
+            ],
+            [dash.dependencies.Input('submit-button', 'n_clicks')],
+            [dash.dependencies.State('location-input', 'value')]
+        )
+        @metrics.timed('skyscope_callback_seconds', callback='update_forecast_data')
+        def update_forecast_data(n_clicks, location):
+            # The only server round trip: units, day range and chart choice are applied in the browser
+            locations = self.parse_locations(location or '')
+            if n_clicks == 0 or not locations:
+                return "Please enter a location and click Submit.", None
+
+            # Comparisons are built by the server; this mode charts the first location
+            location = locations[0]
+            columns = self.forecast_columns(location)
+            if columns is None:
+                return f"No data available for {location}. Please check the location and try again.", None
+            return f"Weather forecast for {location.capitalize()}:", self.client_data(columns)
+
+        for name, _ in CHARTS:
+            self.app.clientside_callback(
+                dash.ClientsideFunction(namespace='skyscope', function_name=name),
+                [
+                    dash.dependencies.Output(f'client-{name}', 'figure'),
+                    dash.dependencies.Output(f'client-{name}', 'style')
+                ],
+                [
+                    dash.dependencies.Input('forecast-data', 'data'),
+                    dash.dependencies.Input('units-toggle', 'value'),
+                    dash.dependencies.Input('days-slider', 'value'),
+                    dash.dependencies.Input('chart-picker', 'value')
+                ],
+                [dash.dependencies.State('chart-template', 'data')]
             )
-    
-    def run(self):
+
+    def update_comparison(self, locations):
+        grid, missing = self.comparison_data(locations)
+        if not grid.locations:
+            return "No data available for these locations. Please check them and try again.", None, {}, {'display': 'none'}
+
+        # Comparison figures go through the figure cache like single-location ones
+        key, _ = self.create_comparison_plots(grid)
+        message = f"Comparing {len(grid.locations)} locations"
+        if missing:
+            message += f" (no data for {', '.join(missing)})"
+        return message + ":", {
+            'key': key,
+            'locations': locations,
+            'compare': True,
+            'patch': False
+        }, {'display': 'none'}, {}
+
+    def comparison_callback(self, index, graph_id):
+        @self.app.callback(
+            dash.dependencies.Output(graph_id, 'figure'),
+            [dash.dependencies.Input('forecast-key', 'data')]
+        )
+        @metrics.timed('skyscope_callback_seconds', callback=graph_id)
+        def update_comparison_chart(forecast):
+            if not forecast or not forecast.get('compare'):
+                return {}
+
+            figures = self.figure_cache.get(forecast['key'])
+            if figures is None:
+                grid, _ = self.comparison_data(forecast['locations'])
+                _, figures = self.create_comparison_plots(grid)
+            return figures[index]
+
+    def chart_callback(self, index, graph_id):
+        @self.app.callback(
+            dash.dependencies.Output(graph_id, 'figure'),
+            [dash.dependencies.Input('forecast-key', 'data')]
+        )
+        @metrics.timed('skyscope_callback_seconds', callback=graph_id)
+        def update_chart(forecast):
+            if not forecast or forecast.get('compare'):
+                return {}
+
+            figures = self.figure_cache.get(forecast['key'])
+            if figures is None:
+                daily_forecasts = self.weather_data(forecast['location'])
+                if not daily_forecasts:
+                    return {}
+                figures = self.create_plots(daily_forecasts, self.location_key(forecast['location']))
+
+            if forecast['patch'] and graph_id not in UNPATCHED_GRAPH_IDS:
+                return self.figure_patch(figures[index])
+            return figures[index]
+
+    def instrument(self, server):
+        # Whole callback requests: the callback itself plus Dash's JSON encoding and Flask overhead
+        @server.before_request
+        def start_timer():
+            flask.g.skyscope_start = time.perf_counter()
+
+        @server.after_request
+        def stop_timer(response):
+            start = flask.g.pop('skyscope_start', None)
+            if start is not None and flask.request.path.endswith('/_dash-update-component'):
+                metrics.observe('skyscope_request_seconds', time.perf_counter() - start, path='_dash-update-component')
+            return response
+
+        metrics.gauges('skyscope_forecast_cache', self.cache.stats)
+        metrics.gauges('skyscope_figure_cache', self.figure_cache.stats)
+        metrics.gauges('skyscope_refresher', self.refresher.metrics)
+        metrics.gauges('skyscope_singleflight', self.flights.stats)
+        metrics.gauges('skyscope_locations', self.locations.stats)
+        if self.store is not None:
+            metrics.gauges('skyscope_store', self.store.stats)
+        scheduler = getattr(self.source, 'scheduler', None)
+        if scheduler is not None:
+            # Remaining per-minute and per-day calls, queue depth and 429s
+            metrics.gauges('skyscope_upstream', scheduler.stats)
+
+        @server.route('/metrics')
+        def prometheus_metrics():
+            return flask.Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    def setup(self):
         self.app_layout()
         self.callback()
-        self.app.run_server(debug=True)
+        self.refresher.start()
+        if metrics.enabled:
+            self.instrument(self.app.server)
+        return self.app.server
+
+    def run(self, debug=False):
+        # Development server only; use wsgi.py to serve the dashboard in production
+        self.setup()
+        self.app.run_server(debug=debug)
 
 if __name__ == '__main__':
     dashboard = Skylitics()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The scripts and the skyscope package live in the SkyScope directory, next to tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
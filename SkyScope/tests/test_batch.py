@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from skyscope.batch import BatchFetcher
+from skyscope.client import FetchClient
+from skyscope.sources import FetchError, HTTPSource, SyntheticSource
+from skyscope.stub import StubUpstream
+
+
+class BrokenSource(SyntheticSource):
+
+    def fetch(self, location, units='metric'):
+        if location == 'Broken':
+            raise ValueError("unexpected payload")
+        return super().fetch(location, units)
+
+
+class HTMLStub(StubUpstream):
+
+    def respond(self, params):
+        return 200, {}, b'<html>Bad gateway</html>'
+
+
+def collect(fetcher, locations):
+    async def run():
+        return [result async for result in fetcher.stream(locations)]
+    return asyncio.run(run())
+
+
+def test_one_failing_location_does_not_end_the_stream():
+    results = collect(BatchFetcher(BrokenSource(), concurrency=2), ['London', 'Broken', 'Paris'])
+
+    by_location = {result.location: result for result in results}
+    assert set(by_location) == {'London', 'Broken', 'Paris'}
+    assert 'unexpected payload' in by_location['Broken'].error
+    assert by_location['London'].error is None
+    assert by_location['Paris'].error is None
+
+
+def test_non_json_body_is_a_fetch_error():
+    with HTMLStub() as stub:
+        source = HTTPSource(url=stub.url, client=FetchClient(retries=0))
+        with pytest.raises(FetchError, match='Invalid forecast response'):
+            source.fetch('London')
@@ -0,0 +1,80 @@
+from skyscope.cache import ForecastCache, forecast_key
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ForecastCache(ttl=60, clock=clock)
+    cache.set('london', 'forecast')
+
+    clock.now += 59
+    assert cache.get('london') == 'forecast'
+    clock.now += 1
+    assert cache.get('london') is None
+    assert len(cache) == 0
+
+
+def test_no_ttl_never_expires():
+    clock = Clock()
+    cache = ForecastCache(ttl=None, clock=clock)
+    cache.set('london', 'forecast')
+
+    clock.now += 10 ** 9
+    assert cache.get('london') == 'forecast'
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = ForecastCache(maxsize=2, clock=Clock())
+    cache.set('london', 1)
+    cache.set('paris', 2)
+    cache.get('london')  # Paris is now the least recently used
+    cache.set('tokyo', 3)
+
+    assert cache.get('paris') is None
+    assert cache.get('london') == 1
+    assert cache.get('tokyo') == 3
+
+
+def test_stats_count_hits_misses_and_evictions():
+    clock = Clock()
+    cache = ForecastCache(maxsize=1, ttl=60, clock=clock)
+    cache.set('london', 1)
+    cache.get('london')
+    cache.get('paris')
+    cache.set('paris', 2)
+    clock.now += 60
+    cache.get('paris')
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 1)
+    assert stats['hit_rate'] == 1 / 3
+    assert stats['size'] == 0
+
+
+def test_get_or_set_calls_produce_only_on_a_miss():
+    cache = ForecastCache(clock=Clock())
+    calls = []
+
+    def produce():
+        calls.append(1)
+        return 'forecast'
+
+    assert cache.get_or_set('london', produce) == 'forecast'
+    assert cache.get_or_set('london', produce) == 'forecast'
+    assert len(calls) == 1
+
+    # A failed fetch is not cached
+    assert cache.get_or_set('paris', lambda: None) is None
+    assert cache.get('paris') is None
+
+
+def test_forecast_key_normalizes_spelling():
+    assert forecast_key('  new   york , US') == forecast_key('New York,us') == ('new york,us', 'metric')
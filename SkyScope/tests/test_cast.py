@@ -0,0 +1,47 @@
+import argparse
+import csv
+import io
+import json
+import sys
+
+import clime_cast
+from skyscope.forecast import daily_forecasts
+from skyscope.sources import SyntheticSource
+from skyscope.stub import forecast_payload
+
+
+def test_format_forecast_labels_follow_units():
+    data = forecast_payload('London')
+    daily = daily_forecasts(data['list'])
+
+    metric = clime_cast.Skylitics.format_forecast(data['city'], daily)
+    assert '°C' in metric and ' m/s' in metric
+
+    imperial = clime_cast.Skylitics.format_forecast(data['city'], daily, 'imperial')
+    assert '°F' in imperial and ' mph' in imperial and '°C' not in imperial
+
+    standard = clime_cast.Skylitics.format_forecast(data['city'], daily, 'standard')
+    assert ' K\n' in standard and '°C' not in standard
+
+
+def test_batch_output_records_units():
+    out = io.StringIO()
+    assert clime_cast.run_batch(['London'], 'jsonl', out, SyntheticSource(), units='imperial') == 0
+    assert json.loads(out.getvalue())['units'] == 'imperial'
+
+    out = io.StringIO()
+    clime_cast.run_batch(['London'], 'csv', out, SyntheticSource(), units='imperial')
+    assert {row['units'] for row in csv.DictReader(io.StringIO(out.getvalue()))} == {'imperial'}
+
+
+def test_interactive_run_honours_units_and_days(monkeypatch, capsys):
+    monkeypatch.setattr('builtins.input', lambda prompt: 'London')
+    monkeypatch.setattr(sys.stdin, 'isatty', lambda: True)
+    monkeypatch.setattr(clime_cast, 'HTTPSource', SyntheticSource)
+    parser = argparse.ArgumentParser()
+    clime_cast.add_arguments(parser)
+
+    assert clime_cast.main(parser.parse_args(['--units', 'imperial', '--days', '2'])) == 0
+    output = capsys.readouterr().out
+    assert '°F' in output and '°C' not in output
+    assert output.count('Temperature:') == 2
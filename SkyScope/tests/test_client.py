@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from skyscope import client as client_module
+from skyscope.client import FetchClient
+from skyscope.stub import StubUpstream
+
+
+@pytest.fixture
+def stub():
+    with StubUpstream() as stub:
+        yield stub
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Backoff delays are recorded instead of slept
+    delays = []
+    monkeypatch.setattr(client_module.time, 'sleep', delays.append)
+    return delays
+
+
+def test_retries_after_503_then_succeeds(stub, sleeps):
+    stub.fail_next(503, times=2)
+    response = FetchClient(retries=3).get(stub.url, {'q': 'London'})
+
+    assert response.status_code == 200
+    assert stub.requests == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_after_is_honoured_and_capped(stub, sleeps):
+    stub.fail_next(503, retry_after=2)
+    stub.fail_next(503, retry_after=60)
+    response = FetchClient(retries=3, max_backoff=8.0).get(stub.url, {'q': 'London'})
+
+    assert response.status_code == 200
+    assert sleeps == [2.0, 8.0]
+
+
+def test_no_retry_with_retries_zero(stub, sleeps):
+    stub.fail_next(503)
+    response = FetchClient(retries=0).get(stub.url, {'q': 'London'})
+
+    assert response.status_code == 503
+    assert stub.requests == 1
+    assert sleeps == []
+
+
+def test_slow_upstream_raises_read_timeout():
+    with StubUpstream(delay=1.0) as stub:
+        with pytest.raises(requests.Timeout):
+            FetchClient(retries=0, read_timeout=0.1).get(stub.url, {'q': 'London'})
+
+
+def test_requests_reuse_one_pooled_connection(stub):
+    client = FetchClient()
+    for location in ('London', 'Paris', 'Tokyo', 'Lima'):
+        assert client.get(stub.url, {'q': location}).status_code == 200
+
+    assert stub.requests == 4
+    assert len(stub.connections) == 1
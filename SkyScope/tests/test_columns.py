@@ -0,0 +1,39 @@
+from datetime import date
+
+import numpy as np
+
+from skyscope.columns import ForecastColumns, daily_aggregate, first_per_day, series
+from skyscope.stub import forecast_payload
+
+# 2024-01-01 00:00 UTC
+START = 1704067200
+TODAY = date(2024, 1, 1)
+
+
+def columns(count=40):
+    return ForecastColumns.from_list(forecast_payload('London', count, start=START)['list'])
+
+
+def test_series_and_first_per_day_select_the_horizon():
+    forecast = columns()
+    assert len(series(forecast, days=2, today=TODAY)) == 16
+    assert list(first_per_day(forecast, days=3, today=TODAY).dt) == [START, START + 86400, START + 2 * 86400]
+
+
+def test_daily_aggregate_matches_a_per_day_loop():
+    forecast = columns()
+    aggregates = daily_aggregate(forecast, days=5, today=TODAY)
+
+    assert [str(day) for day in aggregates.date] == ['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05']
+    for index, day in enumerate(range(5)):
+        in_day = (forecast.dt >= START + day * 86400) & (forecast.dt < START + (day + 1) * 86400)
+        assert aggregates.count[index] == in_day.sum() == 8
+        assert aggregates.temp_min[index] == forecast.temp[in_day].min()
+        assert aggregates.temp_max[index] == forecast.temp[in_day].max()
+        assert np.isclose(aggregates.temp_mean[index], forecast.temp[in_day].mean())
+        assert np.isclose(aggregates.pop_sum[index], forecast.pop[in_day].sum())
+
+
+def test_daily_aggregate_of_no_entries_is_empty():
+    aggregates = daily_aggregate(columns(), days=3, today=date(2030, 1, 1))
+    assert len(aggregates.date) == 0 and len(aggregates.pop_sum) == 0
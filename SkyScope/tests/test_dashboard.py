@@ -0,0 +1,185 @@
+import pytest
+
+import skyscope_dashboard
+from skyscope.sources import FetchError, SyntheticSource
+from skyscope.store import ForecastStore
+from skyscope.stub import forecast_payload
+
+
+@pytest.fixture
+def series_dashboard():
+    return skyscope_dashboard.Skylitics(mode='series', days=3, source=SyntheticSource())
+
+
+def test_series_mode_adds_the_daily_summary_chart(series_dashboard):
+    assert 'summary-chart' in series_dashboard.graph_ids()
+    assert len(series_dashboard.graph_ids()) == len(series_dashboard.charts())
+
+    figures = series_dashboard.create_plots(series_dashboard.weather_data('London'))
+    summary = figures[series_dashboard.graph_ids().index('summary-chart')]
+    assert summary['layout']['title']['text'] == "Daily Summary for the Next 3 Days"
+    assert len(summary['data'][0]['x']) == 3
+
+
+def test_daily_mode_has_no_summary_chart():
+    dashboard = skyscope_dashboard.Skylitics(source=SyntheticSource())
+    assert 'summary-chart' not in dashboard.graph_ids()
+
+
+def post_callback(client, output, outputs, inputs, state=()):
+    response = client.post('/_dash-update-component', json={
+        'output': output,
+        'outputs': outputs,
+        'inputs': list(inputs),
+        'state': list(state),
+        'changedPropIds': [f"{inputs[0]['id']}.{inputs[0]['property']}"],
+    })
+    assert response.status_code == 200
+    return response
+
+
+def submit(client, location, n_clicks, previous):
+    response = post_callback(
+        client,
+        '..forecast-output.children...forecast-key.data...single-charts.style...comparison-charts.style..',
+        [{'id': 'forecast-output', 'property': 'children'}, {'id': 'forecast-key', 'property': 'data'},
+         {'id': 'single-charts', 'property': 'style'}, {'id': 'comparison-charts', 'property': 'style'}],
+        [{'id': 'submit-button', 'property': 'n_clicks', 'value': n_clicks}],
+        [{'id': 'location-input', 'property': 'value', 'value': location},
+         {'id': 'forecast-key', 'property': 'data', 'value': previous}]
+    )
+    return response.get_json()['response']['forecast-key']['data']
+
+
+def test_separator_only_input_asks_for_a_location(client):
+    for text in (' ', ' ; ', ';\n;'):
+        response = post_callback(
+            client,
+            '..forecast-output.children...forecast-key.data...single-charts.style...comparison-charts.style..',
+            [{'id': 'forecast-output', 'property': 'children'}, {'id': 'forecast-key', 'property': 'data'},
+             {'id': 'single-charts', 'property': 'style'}, {'id': 'comparison-charts', 'property': 'style'}],
+            [{'id': 'submit-button', 'property': 'n_clicks', 'value': 1}],
+            [{'id': 'location-input', 'property': 'value', 'value': text},
+             {'id': 'forecast-key', 'property': 'data', 'value': None}]
+        )
+        output = response.get_json()['response']['forecast-output']['children']
+        assert output == "Please enter a location and click Submit."
+
+
+def test_clientside_mode_asks_for_a_location_on_separator_only_input():
+    dashboard = skyscope_dashboard.Skylitics(source=SyntheticSource(), clientside=True)
+    client = dashboard.setup().test_client()
+    try:
+        response = post_callback(
+            client,
+            '..forecast-output.children...forecast-data.data..',
+            [{'id': 'forecast-output', 'property': 'children'}, {'id': 'forecast-data', 'property': 'data'}],
+            [{'id': 'submit-button', 'property': 'n_clicks', 'value': 1}],
+            [{'id': 'location-input', 'property': 'value', 'value': ' ; '}]
+        )
+    finally:
+        dashboard.refresher.stop()
+    output = response.get_json()['response']['forecast-output']['children']
+    assert output == "Please enter a location and click Submit."
+
+
+def chart(client, graph_id, forecast):
+    return post_callback(
+        client,
+        f'{graph_id}.figure',
+        {'id': graph_id, 'property': 'figure'},
+        [{'id': 'forecast-key', 'property': 'data', 'value': forecast}]
+    )
+
+
+@pytest.fixture
+def client():
+    dashboard = skyscope_dashboard.Skylitics(source=SyntheticSource())
+    server = dashboard.setup()
+    yield server.test_client()
+    dashboard.refresher.stop()
+
+
+def test_second_location_is_sent_as_a_smaller_patch(client):
+    first = submit(client, 'London', 1, None)
+    assert first['patch'] is False
+    second = submit(client, 'Paris', 2, first)
+    assert second['patch'] is True
+
+    for graph_id in ['bar-chart', 'heatmap', 'combined-chart']:
+        full = chart(client, graph_id, first)
+        patch = chart(client, graph_id, second)
+        assert 'template' in full.get_data(as_text=True)
+        assert '__dash_patch_update' in patch.get_data(as_text=True)
+        assert len(patch.data) < len(full.data)
+
+
+def test_history_chart_is_always_sent_whole(tmp_path):
+    dashboard = skyscope_dashboard.Skylitics(source=SyntheticSource(), store=ForecastStore(str(tmp_path / 'skyscope.db')))
+    client = dashboard.setup().test_client()
+    try:
+        first = submit(client, 'London', 1, None)
+        second = submit(client, 'Paris', 2, first)
+        assert second['patch'] is True
+
+        history = chart(client, 'history-chart', second).get_json()['response']['history-chart']['figure']
+        assert '__dash_patch_update' not in history
+        assert [trace['name'].startswith('Issued') for trace in history['data']] == [True]
+        assert '__dash_patch_update' in chart(client, 'bar-chart', second).get_data(as_text=True)
+    finally:
+        dashboard.refresher.stop()
+        dashboard.store.close()
+
+
+class DeadSource:
+
+    def fetch(self, location, units='metric'):
+        raise FetchError("upstream down")
+
+
+class PortlandSource:
+    # Two cities share the name "Portland" in the US
+    CITIES = {
+        'portland,me,us': {'id': 4975802, 'name': 'Portland', 'country': 'US'},
+        'portland,or,us': {'id': 5746545, 'name': 'Portland', 'country': 'US'},
+    }
+
+    def __init__(self):
+        self.queries = []
+
+    def fetch(self, location, units='metric'):
+        self.queries.append(location)
+        by_id = {f"id:{city['id']}": city for city in self.CITIES.values()}
+        city = self.CITIES.get(location.lower()) or by_id[location]
+        return dict(forecast_payload(city['name']), city=dict(city))
+
+
+def test_resolved_locations_are_fetched_by_city_id():
+    source = PortlandSource()
+    dashboard = skyscope_dashboard.Skylitics(source=source)
+    dashboard.weather_data('Portland,ME,US')
+    dashboard.weather_data('Portland,OR,US')
+
+    maine, oregon = dashboard.location_key('Portland,ME,US'), dashboard.location_key('Portland,OR,US')
+    assert maine == ('id:4975802', 'metric')
+    assert oregon == ('id:5746545', 'metric')
+
+    # A refresh of the tracked key asks for the same city, not whichever "Portland,US" is first
+    assert dashboard.fetch_forecast(maine)['city']['id'] == 4975802
+    assert source.queries[-1] == 'id:4975802'
+
+
+def test_restart_serves_typed_locations_from_the_store(tmp_path):
+    path = str(tmp_path / 'skyscope.db')
+    before = skyscope_dashboard.Skylitics(source=SyntheticSource(), store=ForecastStore(path))
+    expected = before.weather_data('London')
+    (canonical, _), = before.store.locations()
+    assert canonical != 'london'
+
+    # A new process: empty in-memory resolver and caches, and no upstream
+    after = skyscope_dashboard.Skylitics(source=DeadSource(), store=ForecastStore(path))
+    restored = after.weather_data('London')
+    assert restored is not None
+    assert list(restored.temp) == list(expected.temp)
+    assert after.weather_data(canonical) is not None
+    assert after.weather_data('Paris') is None
@@ -0,0 +1,40 @@
+import argparse
+import os
+
+import clime_charts
+from skyscope.export import export_locations
+from skyscope.sources import SyntheticSource
+
+
+class EmptySource(SyntheticSource):
+    # A forecast with no entries for one location, so its gauge chart has nothing to show
+
+    def fetch(self, location, units='metric'):
+        data = super().fetch(location, units)
+        if location == 'Empty':
+            data['list'] = []
+        return data
+
+
+def test_a_failing_location_is_reported_and_the_export_continues(tmp_path):
+    results = {
+        location: (paths, error)
+        for location, paths, error in export_locations(
+            ['London', 'Empty', 'Paris'], str(tmp_path), processes=1, source=EmptySource(), progress=None
+        )
+    }
+
+    assert set(results) == {'London', 'Empty', 'Paris'}
+    assert results['Empty'][0] == [] and results['Empty'][1]
+    for location in ('London', 'Paris'):
+        paths, error = results[location]
+        assert error is None
+        assert all(os.path.exists(path) for path in paths)
+
+
+def test_several_locations_need_export(capsys):
+    parser = argparse.ArgumentParser()
+    clime_charts.add_arguments(parser)
+    for argv in (['London', 'Paris'], ['-f', 'locations.txt']):
+        assert clime_charts.main(parser.parse_args(argv)) == 2
+        assert '--export' in capsys.readouterr().err
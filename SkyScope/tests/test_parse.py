@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from skyscope.columns import ForecastColumns
+from skyscope.forecast import compact_forecast
+from skyscope.parse import ForecastArrays, parse_forecast_bytes
+from skyscope.stub import forecast_payload
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_streamed_parse_matches_the_compact_payload(chunk_size):
+    payload = forecast_payload('São Paulo', count=40)
+    forecast = parse_forecast_bytes(json.dumps(payload, ensure_ascii=False).encode(), chunk_size)
+
+    assert forecast.to_payload() == compact_forecast(payload)
+    assert dict(forecast) == forecast.to_payload()
+    assert forecast['city'] == payload['city']
+
+
+def test_whole_number_fields_stay_integers():
+    entry = parse_forecast_bytes(json.dumps(forecast_payload(count=2)).encode())['list'][0]
+    assert isinstance(entry['main']['humidity'], int)
+    assert isinstance(entry['main']['pressure'], int)
+    assert isinstance(entry['wind']['deg'], int)
+
+
+def test_a_fractional_value_widens_its_column():
+    payload = forecast_payload(count=3)
+    payload['list'][2]['main']['pressure'] = 1012.5
+    forecast = parse_forecast_bytes(json.dumps(payload).encode())
+
+    assert [entry['main']['pressure'] for entry in forecast['list']] == [item['main']['pressure'] for item in payload['list']]
+    assert forecast.pressure.typecode == 'd'
+
+
+def test_columns_match_from_list():
+    payload = forecast_payload(count=40)
+    expected = ForecastColumns.from_list(payload['list'])
+    columns = ForecastColumns.from_payload(parse_forecast_bytes(json.dumps(payload).encode()))
+
+    for name in ('dt', 'temp', 'humidity', 'pressure', 'wind_speed', 'wind_deg', 'pop', 'weather'):
+        assert np.array_equal(getattr(columns, name), getattr(expected, name))
+        assert getattr(columns, name).dtype == getattr(expected, name).dtype
+    assert columns.conditions == expected.conditions
+
+
+def test_malformed_body_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_forecast_bytes(b'<html>Bad gateway</html>')
+    assert isinstance(parse_forecast_bytes(b'{"cod": "200", "list": []}'), ForecastArrays)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from skyscope.redis_cache import RedisForecastCache
+from skyscope.refresher import ForecastRefresher
+from skyscope.stub import StubKeyValue, forecast_payload
+
+KEY = ('london', 'metric')
+
+
+@pytest.fixture
+def server():
+    with StubKeyValue() as server:
+        yield server
+
+
+def worker_caches(server, count):
+    # One cache per simulated worker process, each with its own connection
+    return [RedisForecastCache.from_url(server.url, poll_interval=0.01) for _ in range(count)]
+
+
+def test_one_worker_fetches_a_missing_forecast_for_all(server):
+    caches = worker_caches(server, 6)
+    gate = threading.Event()
+    calls = []
+    results = [None] * len(caches)
+
+    def produce():
+        calls.append(1)
+        gate.wait(5)  # Hold the lock until every worker is waiting on it
+        return forecast_payload('London', 4)
+
+    def lookup(index):
+        results[index] = caches[index].get_or_set(KEY, produce)
+
+    threads = [threading.Thread(target=lookup, args=(index,)) for index in range(len(caches))]
+    for thread in threads:
+        thread.start()
+    while sum(cache.misses for cache in caches) < len(caches):
+        time.sleep(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result['city']['name'] == 'London' for result in results)
+    assert sum(cache.coalesced for cache in caches) == len(caches) - 1
+
+
+def test_refresh_reuses_an_entry_another_worker_stored_for_the_step(server):
+    now = [10000.0]
+    first, second = (RedisForecastCache.from_url(server.url, clock=lambda: now[0]) for _ in range(2))
+    first.set(KEY, forecast_payload('London', 4))
+
+    # Stored before the step boundary: stale, so this worker fetches
+    fetched = []
+    refresher = ForecastRefresher(lambda key: fetched.append(key) or forecast_payload('London', 4),
+                                  cache=second, step=3600, clock=lambda: now[0])
+    refresher.track(KEY)
+    now[0] += 3600
+    refresher._refresh(KEY)
+    assert fetched == [KEY]
+
+    # Another worker refreshes the next step first; this one takes its entry instead
+    now[0] += 3600
+    first.set(KEY, forecast_payload('London', 4))
+    refresher._refresh(KEY)
+    assert fetched == [KEY]
+    assert refresher.refreshes == 2
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from skyscope import scheduler as scheduling
+from skyscope.batch import BatchFetcher
+from skyscope.client import FetchClient
+from skyscope.scheduler import UpstreamScheduler, scheduler_from_env, share_quota, shared_scheduler
+from skyscope.sources import HTTPSource
+from skyscope.stub import StubUpstream
+
+
+@pytest.fixture
+def whole_quota():
+    yield
+    share_quota(1)
+
+
+def test_share_quota_splits_the_budget_between_processes(whole_quota):
+    environ = {'SKYSCOPE_CALLS_PER_MINUTE': '60', 'SKYSCOPE_CALLS_PER_DAY': '1000'}
+
+    share_quota(4)
+    scheduler = scheduler_from_env('api.openweathermap.org', environ)
+
+    assert scheduler.per_minute == 15
+    assert scheduler.per_day == 250
+
+
+def test_share_quota_replaces_schedulers_made_before_it(whole_quota):
+    url = 'https://api.openweathermap.org/data/2.5/forecast'
+    before = shared_scheduler(url)
+
+    share_quota(2)
+
+    after = shared_scheduler(url)
+    assert after is not before
+    assert after.per_minute == scheduling.DEFAULT_PER_MINUTE // 2
+
+
+def test_batch_calls_go_through_the_scheduler_at_batch_priority():
+    scheduler = UpstreamScheduler(per_minute=None, per_day=None)
+    with StubUpstream() as stub:
+        source = HTTPSource(url=stub.url, client=FetchClient(retries=0), scheduler=scheduler)
+
+        async def run():
+            return [result async for result in BatchFetcher(source, concurrency=2).stream(['London', 'Paris'])]
+        results = asyncio.run(run())
+
+    assert [result.error for result in results] == [None, None]
+    assert scheduler.stats()['calls'] == {'interactive': 0, 'background': 0, 'batch': 2}
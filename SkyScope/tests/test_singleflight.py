@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from skyscope.singleflight import SingleFlight
+
+
+def run_together(flight, key, func, count):
+    # Starts `count` callers and returns once all of them are in do(); the caller releases them
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, func))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    while flight.stats()['calls'] + flight.stats()['coalesced'] < count:
+        time.sleep(0.01)
+    return threads, results, errors
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        return 'forecast'
+
+    threads, results, errors = run_together(flight, 'london', fetch, 5)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['forecast'] * 5
+    assert errors == []
+    assert flight.stats() == {'calls': 1, 'coalesced': 4, 'in_flight': 0}
+
+
+def test_concurrent_calls_share_one_exception():
+    flight = SingleFlight()
+    gate = threading.Event()
+    failure = ValueError("upstream down")
+
+    def fetch():
+        gate.wait(5)
+        raise failure
+
+    threads, results, errors = run_together(flight, 'london', fetch, 3)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == []
+    assert errors == [failure] * 3
+
+
+def test_later_calls_run_again():
+    flight = SingleFlight()
+    assert flight.do('london', lambda: 1) == 1
+    assert flight.do('london', lambda: 2) == 2
+    with pytest.raises(KeyError):
+        flight.do('paris', lambda: {}['missing'])
+    assert flight.stats() == {'calls': 3, 'coalesced': 0, 'in_flight': 0}
@@ -0,0 +1,30 @@
+import os
+
+from skyscope.locations import LocationResolver
+from skyscope.redis_cache import RedisForecastCache
+from skyscope.scheduler import share_quota
+from skyscope.store import ForecastStore
+from skyscope_dashboard import Skylitics
+
+# The upstream comes from SKYSCOPE_UPSTREAM_URL and OPENWEATHERMAP_API_KEY (see skyscope/sources.py).
+# Each worker process imports this module and builds its own dashboard, so do not
+# start gunicorn with --preload: the background refresher threads would not survive the fork
+# Gunicorn starts WEB_CONCURRENCY workers when --workers is not given; each one gets an
+# equal share of the upstream quota, since every worker schedules its own calls
+share_quota(int(os.environ.get('WEB_CONCURRENCY', '1')))
+
+dashboard = Skylitics(
+    mode=os.environ.get('SKYSCOPE_MODE', 'daily'),
+    days=int(os.environ.get('SKYSCOPE_DAYS', '3')),
+    compact=os.environ.get('SKYSCOPE_COMPACT') == '1',
+    # Unit, day-range and chart changes are then handled in the browser without a callback
+    clientside=os.environ.get('SKYSCOPE_CLIENTSIDE') == '1',
+    # e.g. redis://localhost:6379/0, so every worker shares one forecast cache
+    cache=RedisForecastCache.from_url(os.environ['SKYSCOPE_CACHE_URL']) if 'SKYSCOPE_CACHE_URL' in os.environ else None,
+    # e.g. skyscope.db; workers share the file, so restarts are served from disk
+    store=ForecastStore(os.environ['SKYSCOPE_STORE']) if 'SKYSCOPE_STORE' in os.environ else None,
+    # e.g. locations.db; each worker loads the known cities at start and adds the ones it learns
+    locations=LocationResolver(os.environ['SKYSCOPE_LOCATIONS']) if 'SKYSCOPE_LOCATIONS' in os.environ else None
+)
+app = dashboard.app
+server = dashboard.setup()